@@ -8,6 +8,15 @@ def insert_master_configs():
         ("MAX_ESCALATION_LEVEL", "3"),
         ("SLA_CLOSURE_DAYS", "7"),
         ("DEFAULT_PRIORITY", Priority.MEDIUM.value),  # Use enum value
+        ("AUDIT_RETENTION_DAYS", "90"),
+        # Hours without an update before an open grievance is escalated;
+        # ESCALATION_HOURS_SUBJECT_<id> overrides the priority thresholds
+        ("ESCALATION_HOURS", "72"),
+        ("ESCALATION_HOURS_HIGH", "48"),
+        ("ESCALATION_HOURS_URGENT", "24"),
+        # Open grievances of the same area/subject this close and this similar are flagged as duplicates
+        ("DUPLICATE_RADIUS_METERS", "100"),
+        ("DUPLICATE_SIMILARITY_THRESHOLD", "0.3"),
     ]
 
     inserted, updated = 0, 0
@@ -5,10 +5,12 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_mail import Mail
-from .config import Config
+import os
+from .config import Config, config_by_name
 from flask_cors import CORS
 from .extensions import oauth
 from sqlalchemy import MetaData
+from .utils.db_routing import RoutingSession, install_read_your_writes
 
 convention = {
     "ix": "ix_%(column_0_label)s",
@@ -19,22 +21,34 @@ convention = {
 }
 
 metadata = MetaData(naming_convention=convention)
-db = SQLAlchemy(metadata=metadata)
+# reads inside replica_reads() go to the 'replica' bind when one is configured
+db = SQLAlchemy(metadata=metadata, session_options={'class_': RoutingSession})
 migrate = Migrate()
 jwt = JWTManager()
 mail = Mail()
 import logging
 # oauth is defined in extensions.py
 
-def create_app():
+def create_app(config_name=None):
     logging.basicConfig(level=logging.DEBUG)
     logger = logging.getLogger(__name__)
     app = Flask(__name__)
     
-    app.config.from_object(Config)
+    # APP_CONFIG=production selects the Postgres profile
+    app.config.from_object(config_by_name[config_name or os.environ.get('APP_CONFIG', 'development')])
 
     db.init_app(app)
-    migrate.init_app(app, db)
+    from .services.search_service import include_object
+    migrate.init_app(app, db, include_object=include_object)
+    from .utils.db_metrics import install_pool_metrics
+    from .utils.sqlite_pragmas import install_sqlite_pragmas
+    with app.app_context():
+        for engine in db.engines.values():
+            install_pool_metrics(engine)
+            install_sqlite_pragmas(engine, app.config)
+    install_read_your_writes(app)
+    from .utils.pagination import install_truncation_header
+    install_truncation_header(app)
     jwt.init_app(app)
     mail.init_app(app)
     oauth.init_app(app)
@@ -42,7 +56,7 @@ def create_app():
     CORS(app, resources={r"/*": {
         "origins": cors_origins,
         "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Authorization", "Content-Type"],
+        "allow_headers": ["Authorization", "Content-Type", "X-Replica-Sticky-Until"],
         "expose_headers": ["*"],
         "supports_credentials": True
     }})
@@ -57,7 +71,6 @@ def create_app():
     )
 
     # Create upload folder if not exists
-    import os
     if not os.path.exists(app.config['UPLOAD_FOLDER']):
         os.makedirs(app.config['UPLOAD_FOLDER'])
 
@@ -86,4 +99,24 @@ def create_app():
     app.register_blueprint(user_bp, url_prefix='/users')
     app.register_blueprint(admin_bp, url_prefix='/admins')
     app.register_blueprint(settings_bp, url_prefix='/settings')
-    return app
\ No newline at end of file
+
+    if app.config.get('SCHEDULER_ENABLED'):
+        from .utils.scheduler import scheduler
+        register_scheduled_jobs(app)
+        scheduler.start(app)
+    return app
+
+def register_scheduled_jobs(app):
+    """Add the periodic maintenance jobs to the scheduler; run_scheduler.py runs them."""
+    from .utils.scheduler import scheduler
+    from .services.sla_service import auto_close_resolved_grievances
+    from .services.escalation_service import escalate_overdue_grievances
+    from .services.report_job_service import purge_report_jobs
+    delay = app.config.get('SCHEDULER_STARTUP_DELAY', 60)
+    scheduler.add_job('auto_close', auto_close_resolved_grievances, app.config.get('AUTO_CLOSE_INTERVAL', 3600), delay)
+    scheduler.add_job('escalation', escalate_overdue_grievances, app.config.get('ESCALATION_INTERVAL', 900), delay)
+    scheduler.add_job('report_job_purge', purge_report_jobs, app.config.get('REPORT_JOB_PURGE_INTERVAL', 3600), delay)
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            from .utils.sqlite_pragmas import checkpoint_wal
+            scheduler.add_job('wal_checkpoint', checkpoint_wal, app.config.get('WAL_CHECKPOINT_INTERVAL', 300))
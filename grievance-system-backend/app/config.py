@@ -4,15 +4,76 @@ from dotenv import load_dotenv
 basedir = os.path.abspath(os.path.dirname(__file__))
 load_dotenv(os.path.join(basedir, '..', '.env'))
 
+def _database_url(url):
+    # Hosted Postgres often hands out postgres:// URLs, which SQLAlchemy no longer accepts
+    if url and url.startswith('postgres://'):
+        url = 'postgresql://' + url[len('postgres://'):]
+    return url
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'a-hard-to-guess-string-for-dev'
-    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f'sqlite:///{os.path.join(basedir, "..", "app.db")}'
+    SQLALCHEMY_DATABASE_URI = _database_url(os.environ.get('DATABASE_URL')) or f'sqlite:///{os.path.join(basedir, "..", "app.db")}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Optional read replica for report, KPI and heavy list reads (see utils/db_routing.py)
+    REPLICA_DATABASE_URL = _database_url(os.environ.get('REPLICA_DATABASE_URL'))
+    SQLALCHEMY_BINDS = {'replica': REPLICA_DATABASE_URL} if REPLICA_DATABASE_URL else {}
+    # How long a user's reads stay on the primary after they commit a write
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'another-super-secret-jwt-key-for-dev'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(minutes=60)
+    # Applied to each new connection when the database is SQLite; None skips a pragma
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT = int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000))
+    SQLITE_CACHE_SIZE = int(os.environ.get('SQLITE_CACHE_SIZE', -64000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    # PASSIVE never waits on readers or blocks writers; TRUNCATE also shrinks the -wal file
+    SQLITE_CHECKPOINT_MODE = os.environ.get('SQLITE_CHECKPOINT_MODE', 'PASSIVE')
+    WAL_CHECKPOINT_INTERVAL = int(os.environ.get('WAL_CHECKPOINT_INTERVAL', 300))
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 30))
+    MASTER_DATA_CACHE_TTL = int(os.environ.get('MASTER_DATA_CACHE_TTL', 300))
+    # Serve KPIs from grievance_daily_stats; enable after running backfill_kpi_rollup.py
+    KPI_ROLLUP_ENABLED = os.environ.get('KPI_ROLLUP_ENABLED', 'false').lower() in ('1', 'true', 'yes')
     UPLOAD_FOLDER = os.path.join(basedir, '..', 'uploads')
+    # 'transactional' writes audit rows with the change; 'buffered' bulk-inserts them in the background
+    AUDIT_LOG_MODE = os.environ.get('AUDIT_LOG_MODE', 'transactional')
+    AUDIT_FLUSH_INTERVAL = float(os.environ.get('AUDIT_FLUSH_INTERVAL', 1.0))
+    AUDIT_BUFFER_SIZE = int(os.environ.get('AUDIT_BUFFER_SIZE', 500))
+    SLA_CLOSURE_DAYS = int(os.environ.get('SLA_CLOSURE_DAYS', 7))
+    # Off so web workers and CLI scripts don't each start sweeps; run_scheduler.py runs them
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    SCHEDULER_STARTUP_DELAY = int(os.environ.get('SCHEDULER_STARTUP_DELAY', 60))
+    AUTO_CLOSE_INTERVAL = int(os.environ.get('AUTO_CLOSE_INTERVAL', 3600))
+    MAX_ESCALATION_LEVEL = int(os.environ.get('MAX_ESCALATION_LEVEL', 3))
+    # Fallback when MasterConfig has no ESCALATION_HOURS
+    ESCALATION_HOURS = float(os.environ.get('ESCALATION_HOURS', 72))
+    ESCALATION_INTERVAL = int(os.environ.get('ESCALATION_INTERVAL', 900))
+    AUDIT_ARCHIVE_FOLDER = os.environ.get('AUDIT_ARCHIVE_FOLDER') or os.path.join(basedir, '..', 'data', 'audit_archive')
+    AUDIT_RETENTION_DAYS = int(os.environ.get('AUDIT_RETENTION_DAYS', 90))
+    REPORT_JOB_WORKERS = int(os.environ.get('REPORT_JOB_WORKERS', 2))
+    # Finished report jobs and their files are deleted after this long
+    REPORT_JOB_TTL_HOURS = float(os.environ.get('REPORT_JOB_TTL_HOURS', 24))
+    REPORT_JOB_PURGE_INTERVAL = int(os.environ.get('REPORT_JOB_PURGE_INTERVAL', 3600))
+    REPORT_PDF_COLUMNS = os.environ.get(
+        'REPORT_PDF_COLUMNS',
+        'complaint_id,title,status,priority,area_id,ward_number,assigned_to,created_at'
+    ).split(',')
+    REPORT_PDF_ROWS_PER_TABLE = int(os.environ.get('REPORT_PDF_ROWS_PER_TABLE', 40))
+    # Full-text index over grievances and comments (SQLite FTS5 / Postgres tsvector)
+    SEARCH_INDEX_ENABLED = os.environ.get('SEARCH_INDEX_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    # Postgres text search config; run rebuild_search_index.py after changing it
+    SEARCH_TEXT_CONFIG = os.environ.get('SEARCH_TEXT_CONFIG', 'simple')
+    # Fallbacks when MasterConfig has no DUPLICATE_RADIUS_METERS / DUPLICATE_SIMILARITY_THRESHOLD
+    DUPLICATE_DETECTION_ENABLED = os.environ.get('DUPLICATE_DETECTION_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+    DUPLICATE_RADIUS_METERS = float(os.environ.get('DUPLICATE_RADIUS_METERS', 100))
+    DUPLICATE_SIMILARITY_THRESHOLD = float(os.environ.get('DUPLICATE_SIMILARITY_THRESHOLD', 0.3))
+    DUPLICATE_MAX_CANDIDATES = int(os.environ.get('DUPLICATE_MAX_CANDIDATES', 5))
+    DUPLICATE_SCAN_LIMIT = int(os.environ.get('DUPLICATE_SCAN_LIMIT', 500))
     ALLOWED_EXTENSIONS = {'pdf', 'txt', 'jpg', 'jpeg', 'png', 'mp4', 'mov'}
     MAX_CONTENT_LENGTH = 50 * 1024 * 1024 
+    DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE', 50))
+    # Also caps requests without limit/cursor, which get a plain list (flagged X-Result-Truncated when cut)
+    MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE', 500))
     SECURITY_PASSWORD_SALT = os.environ.get('SECURITY_PASSWORD_SALT') or 'a-salt-for-hashing'
     SECURITY_TRACKABLE = True 
     SECURITY_REGISTERABLE = False  
@@ -26,3 +87,27 @@ class Config:
     GOOGLE_CLIENT_SECRET = os.environ.get('GOOGLE_CLIENT_SECRET')
     GOOGLE_DISCOVERY_URL = "https://accounts.google.com/.well-known/openid-configuration"
 
+class ProductionConfig(Config):
+    """
+    Postgres behind a sized connection pool. DATABASE_URL must point at the
+    server; each worker process gets its own pool of
+    DB_POOL_SIZE + DB_MAX_OVERFLOW connections.
+    """
+    SQLALCHEMY_DATABASE_URI = _database_url(os.environ.get('DATABASE_URL'))
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', 10)),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', 20)),
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.environ.get('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': True,
+        'connect_args': {
+            # milliseconds; a runaway query is cancelled instead of holding a pooled connection
+            'options': f"-c statement_timeout={int(os.environ.get('DB_STATEMENT_TIMEOUT', 30000))}",
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 10)),
+        },
+    }
+
+config_by_name = {
+    'development': Config,
+    'production': ProductionConfig,
+}
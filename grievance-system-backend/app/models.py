@@ -49,6 +49,21 @@ class User(db.Model):
         return check_password_hash(self.password_hash, password)
 
 class Grievance(db.Model):
+    # List endpoints filter on one column and page newest first on (created_at, id)
+    __table_args__ = (
+        db.Index('ix_grievance_created_at', 'created_at'),
+        db.Index('ix_grievance_citizen_id_created_at', 'citizen_id', 'created_at'),
+        db.Index('ix_grievance_assigned_to_created_at', 'assigned_to', 'created_at'),
+        db.Index('ix_grievance_assigned_to_status', 'assigned_to', 'status'),
+        db.Index('ix_grievance_status_created_at', 'status', 'created_at'),
+        db.Index('ix_grievance_area_id_status', 'area_id', 'status'),
+        db.Index('ix_grievance_subject_id_created_at', 'subject_id', 'created_at'),
+        db.Index('ix_grievance_priority_created_at', 'priority', 'created_at'),
+        db.Index('ix_grievance_status_updated_at_escalation_level', 'status', 'updated_at', 'escalation_level'),
+        # Duplicate detection: open grievances of one area/subject within a latitude band
+        db.Index('ix_grievance_area_subject_status_latitude', 'area_id', 'subject_id', 'status', 'latitude'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     complaint_id = db.Column(db.String(50), unique=True, nullable=False, default=lambda: str(uuid.uuid4())[:8])
     citizen_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -79,16 +94,16 @@ class Grievance(db.Model):
     subject = db.relationship('MasterSubjects')
     area = db.relationship('MasterAreas')
     category = db.relationship('MasterCategories')
-    attachments = db.relationship('GrievanceAttachment', backref='grievance', lazy='dynamic', cascade="all, delete-orphan")
-    comments = db.relationship('GrievanceComment', backref='grievance', lazy='dynamic', cascade="all, delete-orphan")
-    workproofs = db.relationship('Workproof', backref='grievance', lazy='dynamic', cascade="all, delete-orphan")
+    attachments = db.relationship('GrievanceAttachment', backref='grievance', lazy='select', cascade="all, delete-orphan")
+    comments = db.relationship('GrievanceComment', backref='grievance', lazy='select', cascade="all, delete-orphan")
+    workproofs = db.relationship('Workproof', backref='grievance', lazy='select', cascade="all, delete-orphan")
     def to_dict(self):
         """
         Convert Grievance object to a dictionary for JSON serialization.
         """
-        attachments_list = [attachment.to_dict() for attachment in self.attachments.all()]
-        comments_list = [comment.to_dict() for comment in self.comments.all()]
-        workproofs_list = [workproof.to_dict() for workproof in self.workproofs.all()]
+        attachments_list = [attachment.to_dict() for attachment in self.attachments]
+        comments_list = [comment.to_dict() for comment in self.comments]
+        workproofs_list = [workproof.to_dict() for workproof in self.workproofs]
         
         return {
             'id': self.id,
@@ -152,7 +167,7 @@ class Grievance(db.Model):
         }
 class GrievanceAttachment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    grievance_id = db.Column(db.Integer, db.ForeignKey('grievance.id'), nullable=False)
+    grievance_id = db.Column(db.Integer, db.ForeignKey('grievance.id'), nullable=False, index=True)
     file_path = db.Column(db.String(256), nullable=False)
     file_type = db.Column(db.String(10), nullable=False)  
     file_size = db.Column(db.Integer, nullable=True)  
@@ -169,15 +184,15 @@ class GrievanceAttachment(db.Model):
 
 class GrievanceComment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    grievance_id = db.Column(db.Integer, db.ForeignKey('grievance.id'), nullable=False)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    grievance_id = db.Column(db.Integer, db.ForeignKey('grievance.id'), nullable=False, index=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     comment_text = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     is_public = db.Column(db.Boolean, default=True)  
-    attachments = db.relationship('CommentAttachment', backref='comment', lazy='dynamic', cascade="all, delete-orphan")
+    attachments = db.relationship('CommentAttachment', backref='comment', lazy='select', cascade="all, delete-orphan")
     user = db.relationship('User', backref='comments')
     def to_dict(self):
-        attachments_list = [attachment.to_dict() for attachment in self.attachments.all()]
+        attachments_list = [attachment.to_dict() for attachment in self.attachments]
         
         return {
             'id': self.id,
@@ -196,7 +211,7 @@ class GrievanceComment(db.Model):
 
 class CommentAttachment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    comment_id = db.Column(db.Integer, db.ForeignKey('grievance_comment.id'), nullable=False)
+    comment_id = db.Column(db.Integer, db.ForeignKey('grievance_comment.id'), nullable=False, index=True)
     file_path = db.Column(db.String(256), nullable=False)
     file_type = db.Column(db.String(10), nullable=True) 
     file_size = db.Column(db.Integer, nullable=True)  
@@ -215,8 +230,8 @@ class CommentAttachment(db.Model):
 
 class Workproof(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    grievance_id = db.Column(db.Integer, db.ForeignKey('grievance.id'), nullable=False)
-    uploaded_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    grievance_id = db.Column(db.Integer, db.ForeignKey('grievance.id'), nullable=False, index=True)
+    uploaded_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     file_path = db.Column(db.String(256), nullable=False)
     file_type = db.Column(db.String(10), nullable=False)  
     file_size = db.Column(db.Integer, nullable=False) 
@@ -258,6 +273,13 @@ class MasterCategories(db.Model):
     is_active = db.Column(db.Boolean, default=True)  
 
 class AuditLog(db.Model):
+    __table_args__ = (
+        db.Index('ix_audit_log_timestamp_id', 'timestamp', 'id'),
+        db.Index('ix_audit_log_performed_by_timestamp', 'performed_by', 'timestamp'),
+        db.Index('ix_audit_log_grievance_id_timestamp', 'grievance_id', 'timestamp'),
+        db.Index('ix_audit_log_action_type_timestamp', 'action_type', 'timestamp'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     action = db.Column(db.Text, nullable=False)
     action_type = db.Column(db.String(50), nullable=True)  
@@ -285,13 +307,15 @@ class Announcement(db.Model):
     message = db.Column(db.Text, nullable=False)
     type = db.Column(db.String(50), default="general")  
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    # in the ETag of GET /admins/announcements, so an edit invalidates cached copies
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     expires_at = db.Column(db.DateTime, nullable=True) 
     target_role = db.Column(db.Enum(Role), nullable=True) 
     is_active = db.Column(db.Boolean, default=True) 
 
 class UserPreference(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     notifications_enabled = db.Column(db.Boolean, default=True)  
     language = db.Column(db.String(10), default='en')
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
@@ -322,8 +346,8 @@ class Advertisement(db.Model):
     link_url = db.Column(db.String(500), nullable=True)
     expires_at = db.Column(db.DateTime, nullable=True)
     is_active = db.Column(db.Boolean, default=True)
-    created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
-    updated_at = db.Column(db.DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     def to_dict(self):
         return {
             'id': self.id,
@@ -335,3 +359,26 @@ class Advertisement(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'expires_at': self.expires_at.isoformat() if self.expires_at else None,
         }
+
+class GrievanceDailyStats(db.Model):
+    """
+    Rollup of grievances by the day they were created. Kept up to date by
+    app.services.kpi_rollup_service; `assignee_id` is 0 when unassigned and
+    `resolution_days` is -1 unless the bucket holds closed grievances.
+    """
+    __tablename__ = 'grievance_daily_stats'
+    __table_args__ = (
+        db.UniqueConstraint('day', 'area_id', 'subject_id', 'status', 'assignee_id', 'resolution_days',
+                            name='uq_grievance_daily_stats_bucket'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False, index=True)
+    area_id = db.Column(db.Integer, nullable=False)
+    subject_id = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    assignee_id = db.Column(db.Integer, nullable=False, default=0)
+    resolution_days = db.Column(db.Integer, nullable=False, default=-1)
+    grievance_count = db.Column(db.Integer, nullable=False, default=0)
+    created_epoch_sum = db.Column(db.Float, nullable=False, default=0)
+    resolution_days_sum = db.Column(db.Float, nullable=False, default=0)
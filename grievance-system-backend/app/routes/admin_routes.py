@@ -1,19 +1,27 @@
 from flask import Blueprint, request, jsonify
 from ..utils.auth_utils import admin_required
-from ..utils.kpi_utils import calculate_resolution_rate, calculate_pending_aging, calculate_sla_compliance
 from ..models import AuditLog,MasterConfig, MasterSubjects, MasterAreas, Grievance, User, Role, Announcement, NearbyPlace, Advertisement
-from ..services.report_service import generate_report,get_staff_performance, get_location_reports
+from ..services.report_service import generate_report,get_staff_performance, get_location_reports, validate_report_args, stream_report_csv, COLUMNAR_FORMATS
 
 from ..services.report_service import get_citizen_history
-from ..services.report_service import escalate_grievance
-from ..services.report_service import get_advanced_kpis
+from ..services.grievance_service import escalate_grievance
+from ..services.report_service import get_advanced_kpis, get_dashboard_kpis
+from ..services.report_job_service import submit_report_job, get_report_job, report_job_file, REPORT_EXTENSIONS, REPORT_MIMETYPES
 from datetime import datetime
 from ..schemas import GrievanceSchema, UserSchema, AnnouncementSchema, NearbyPlaceSchema
-from flask import Response
+from flask import Response, stream_with_context, send_file
 from ..schemas import AuditLogSchema, MasterSubjectsSchema, MasterAreasSchema
 from .. import db
-from ..services.grievance_service import reassign_grievance
+from ..services.grievance_service import reassign_grievance, load_grievance_list, paginate_grievances, parse_grievance_fields, dump_grievances
+from ..utils.pagination import get_page_args, page_response
+from ..services.master_data_service import get_master_data
+from ..utils.http_cache import conditional_response, table_version
 from ..services.user_service import add_update_user
+from ..services.audit_service import get_audit_logs, AUDIT_FILTERS
+from ..services.audit_archive_service import archive_audit_logs, list_archive_months, query_audit_archive, get_retention_days
+from ..utils.file_utils import stream_and_remove
+from ..utils.db_metrics import pool_status
+from ..utils.db_routing import read_from_replica
 from flask_cors import cross_origin
 from flask_jwt_extended import jwt_required
 import logging
@@ -21,6 +29,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timezone
 import os
+import tempfile
 from werkzeug.utils import secure_filename
 from flask import current_app
 logging.basicConfig(level=logging.DEBUG)
@@ -31,13 +40,14 @@ admin_bp = Blueprint('admin', __name__)
 @admin_bp.route('/dashboard', methods=['GET'])
 @admin_required
 def dashboard(user):
-    kpis = {
-        'resolution_rate': calculate_resolution_rate(),
-        'pending_aging': calculate_pending_aging(),
-        'sla_compliance': calculate_sla_compliance()
-    }
+    kpis = get_dashboard_kpis()
     return jsonify(kpis), 200
 
+@admin_bp.route('/db/pool', methods=['GET'])
+@admin_required
+def db_pool_status(user):
+    return jsonify({name or 'default': pool_status(engine) for name, engine in db.engines.items()}), 200
+
 @admin_bp.route('/users/<int:id>', methods=['DELETE'])
 @admin_required
 def delete_user(user, id):
@@ -203,9 +213,50 @@ def audit_logs():
 @jwt_required()
 @admin_required
 def _audit_logs_protected(user):
-    logs = AuditLog.query.all()
+    try:
+        limit, cursor = get_page_args()
+        filters = {name: request.args.get(name) for name in AUDIT_FILTERS if request.args.get(name)}
+        logs, next_cursor = get_audit_logs(filters, limit, cursor)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
     schema = AuditLogSchema(many=True)
-    return jsonify(schema.dump(logs)), 200
+    return jsonify(page_response(schema.dump(logs), limit, next_cursor)), 200
+
+@admin_bp.route('/audit-logs/archive', methods=['GET'])
+@admin_required
+def audit_log_archive_months(user):
+    return jsonify({"months": list_archive_months(), "retention_days": get_retention_days()}), 200
+
+@admin_bp.route('/audit-logs/archive', methods=['POST'])
+@admin_required
+def archive_audit_log(user):
+    data = request.get_json(silent=True) or {}
+    try:
+        retention_days = data.get('retention_days')
+        if retention_days is not None:
+            try:
+                retention_days = int(retention_days)
+            except (TypeError, ValueError):
+                raise ValueError("retention_days must be an integer")
+        archived = archive_audit_logs(retention_days)
+        return jsonify({"archived": archived}), 200
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"msg": str(e)}), 500
+
+@admin_bp.route('/audit-logs/archive/<month>', methods=['GET'])
+@admin_required
+def audit_log_archive(user, month):
+    try:
+        limit, cursor = get_page_args()
+        filters = {name: request.args.get(name) for name in AUDIT_FILTERS if request.args.get(name)}
+        entries, next_cursor = query_audit_archive(month, filters, limit, cursor)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    return jsonify(page_response(entries, limit, next_cursor)), 200
+
 @admin_bp.route('/kpis/advanced', methods=['GET'])
 @admin_required
 def advanced_kpis(user):
@@ -216,6 +267,29 @@ def advanced_kpis(user):
 def reports(user):
     filter_type = request.args.get('filter_type', 'all')
     format = request.args.get('format', 'pdf')
+    try:
+        validate_report_args(filter_type, format)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    if format == 'csv':
+        return Response(
+            stream_with_context(stream_report_csv(filter_type)),
+            mimetype='text/csv',
+            headers={"Content-Disposition": "attachment; filename=report.csv"}
+        )
+    if format in COLUMNAR_FORMATS:
+        handle, path = tempfile.mkstemp(suffix=f".{format}")
+        os.close(handle)
+        try:
+            generate_report(filter_type, format, output_path=path)
+        except Exception as e:
+            os.remove(path)
+            return jsonify({"msg": str(e)}), 500
+        return Response(
+            stream_and_remove(path),
+            mimetype=REPORT_MIMETYPES[format],
+            headers={"Content-Disposition": f"attachment; filename=report.{REPORT_EXTENSIONS[format]}"}
+        )
     report_data = generate_report(filter_type, format)
 
     if format == 'pdf':
@@ -225,13 +299,6 @@ def reports(user):
             headers={"Content-Disposition": "attachment; filename=report.pdf"}
         )
 
-    elif format == 'csv':
-        return Response(
-            report_data,
-            mimetype='text/csv',
-            headers={"Content-Disposition": "attachment; filename=report.csv"}
-        )
-
     elif format == 'excel':
         return Response(
             report_data,
@@ -240,7 +307,49 @@ def reports(user):
         )
 
     else:
-        return {"error": "Invalid format. Supported: pdf, csv, excel"}, 400
+        return {"error": "Invalid format. Supported: pdf, csv, excel, parquet, arrow"}, 400
+
+@admin_bp.route('/reports/jobs', methods=['POST'])
+@admin_required
+def create_report_job(user):
+    data = request.get_json(silent=True) or {}
+    try:
+        job = submit_report_job(
+            filter_type=data.get('filter_type', 'all'),
+            format=data.get('format', 'pdf'),
+            user_id=data.get('user_id'),
+            area_id=data.get('area_id'),
+            requested_by=user.id
+        )
+        return jsonify(job), 202
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    except Exception as e:
+        return jsonify({"msg": str(e)}), 500
+
+@admin_bp.route('/reports/jobs/<job_id>', methods=['GET'])
+@admin_required
+def get_report_job_status(user, job_id):
+    job = get_report_job(job_id)
+    if not job:
+        return jsonify({"msg": "Report job not found"}), 404
+    return jsonify(job), 200
+
+@admin_bp.route('/reports/jobs/<job_id>/download', methods=['GET'])
+@admin_required
+def download_report_job(user, job_id):
+    job = get_report_job(job_id)
+    if not job:
+        return jsonify({"msg": "Report job not found"}), 404
+    if job['status'] != 'completed':
+        return jsonify({"msg": f"Report is {job['status']}"}), 409
+    return send_file(
+        report_job_file(job),
+        mimetype=REPORT_MIMETYPES[job['format']],
+        as_attachment=True,
+        download_name=f"report.{REPORT_EXTENSIONS[job['format']]}"
+    )
+
 @admin_bp.route('/users/<int:id>/history', methods=['GET'])
 @admin_required
 def citizen_history(user, id):
@@ -250,6 +359,7 @@ def citizen_history(user, id):
 
 @admin_bp.route('/grievances/all', methods=['GET'])
 @admin_required
+@read_from_replica
 def get_all_grievances(user):
 
     try:
@@ -269,9 +379,15 @@ def get_all_grievances(user):
         if subject_id:
             query = query.filter_by(subject_id=subject_id)
         
-        grievances = query.order_by(Grievance.created_at.desc()).all()
+        limit, cursor = get_page_args()
+        fields = parse_grievance_fields(request.args.get('view'), request.args.get('fields'))
+        grievances, next_cursor = paginate_grievances(query, limit, cursor, fields)
 
-        return jsonify([g.to_dict() for g in grievances])
+        if fields:
+            return jsonify(page_response(dump_grievances(grievances, fields), limit, next_cursor))
+        return jsonify(page_response([g.to_dict() for g in grievances], limit, next_cursor))
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
     except Exception as e:
         return jsonify({"success": False, "message": str(e)}), 500
 
@@ -282,21 +398,19 @@ def get_all_grievances(user):
 def escalate(user, id):
     try:
         data = request.json or {}
-        print("Incoming escalate request:", data)
-
-        new_assignee_id = data.get('assignee_id')
-
         result = escalate_grievance(
             grievance_id=id,
-            escalated_by=user.id,   
-            new_assignee_id=new_assignee_id
+            escalated_by=user.id,
+            new_assignee_id=data.get('assignee_id')
         )
-
+        # the admin client reads "message"
         status_code = 200 if result.get("success") else 400
-        return jsonify(result), status_code
-
+        return jsonify({"success": result["success"], "message": result["msg"]}), status_code
+    except ValueError as e:
+        status_code = 404 if str(e) == "Grievance not found" else 400
+        return jsonify({"success": False, "message": str(e)}), status_code
     except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+        return jsonify({"success": False, "message": str(e)}), 500
 
 
 
@@ -329,15 +443,15 @@ def _manage_configs_protected(user):
 
         db.session.commit()
 
-    configs = MasterConfig.query.all()
+    configs = get_master_data('configs')
     return jsonify([
         {
-            'id': c.id,
-            'key': c.key,
-            'value': c.value,
-            'description': c.description,
-            'created_at': c.created_at,
-            'updated_at': c.updated_at,
+            'id': c['id'],
+            'key': c['key'],
+            'value': c['value'],
+            'description': c['description'],
+            'created_at': c['created_at'],
+            'updated_at': c['updated_at'],
         }
         for c in configs
     ]), 200
@@ -356,12 +470,16 @@ def update_config( key):
 
 @admin_bp.route('/users/history', methods=['GET'])
 @admin_required
+@read_from_replica
 def all_users_history(user):
     users = User.query.filter(User.role == Role.CITIZEN).all()
     result = []
     grievance_schema = GrievanceSchema(many=True)
+    history_by_user = {}
+    for g in load_grievance_list(Grievance.query.filter(Grievance.citizen_id.in_([u.id for u in users]))):
+        history_by_user.setdefault(g.citizen_id, []).append(g)
     for u in users:
-        history = get_citizen_history(u.id)
+        history = history_by_user.get(u.id, [])
         result.append({
             "user": {
                 "id": u.id,
@@ -376,14 +494,14 @@ def all_users_history(user):
 @admin_bp.route('/subjects', methods=['GET'])
 @admin_required
 def list_subjects(user):
-    subjects = MasterSubjects.query.all()
+    subjects = get_master_data('subjects')
     schema = MasterSubjectsSchema(many=True)
     return jsonify(schema.dump(subjects)), 200
 
 @admin_bp.route('/areas', methods=['GET'])
 @admin_required
 def list_areas(user):
-    areas = MasterAreas.query.all()
+    areas = get_master_data('areas')
     schema = MasterAreasSchema(many=True)
     return jsonify(schema.dump(areas)), 200
 
@@ -492,11 +610,16 @@ def create_announcement(user):
 @admin_bp.route('/announcements', methods=['GET'])
 def get_announcements():
     now = datetime.now(timezone.utc)
-    announcements = Announcement.query.filter(
+    current = Announcement.query.filter(
         Announcement.is_active == True,
         db.or_(Announcement.expires_at > now, Announcement.expires_at == None)
-    ).order_by(Announcement.created_at.desc()).all()
-    return AnnouncementSchema(many=True).dump(announcements), 200
+    )
+    version, last_modified = table_version(current, Announcement.id, Announcement.updated_at)
+
+    def build():
+        announcements = current.order_by(Announcement.created_at.desc()).all()
+        return AnnouncementSchema(many=True).dump(announcements), 200
+    return conditional_response(version, build, last_modified)
 
 @admin_bp.route('/announcements/<int:id>', methods=['DELETE'])
 @admin_required
@@ -12,6 +12,7 @@ from ..schemas import UserSchema
 from werkzeug.security import check_password_hash
 # from ..services.otp_service import send_otp, verify_otp
 from ..utils.file_utils import allowed_file
+from ..utils.auth_utils import get_cached_user
 from werkzeug.utils import secure_filename
 import os
 from sqlalchemy.exc import IntegrityError
@@ -68,6 +69,9 @@ def password_login():
 @jwt_required(refresh=True)
 def refresh():
     current_user_id = get_jwt_identity()
+    user = db.session.get(User, int(current_user_id))
+    if not user:
+        return jsonify({"msg": "User not found"}), 404
     new_access_token = create_access_token(identity=current_user_id)
     new_refresh_token = create_refresh_token(identity=current_user_id)
     return jsonify({
@@ -149,7 +153,7 @@ def logout():
 @jwt_required()
 def get_current_user():
     user_id = get_jwt_identity()
-    user = User.query.get(int(user_id))  
+    user = get_cached_user(user_id)
     if not user:
         return jsonify({"msg": "User not found"}), 404
     schema = UserSchema()
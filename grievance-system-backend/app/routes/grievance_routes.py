@@ -8,11 +8,16 @@ from ..services.grievance_service import (
     add_comment, confirm_closure, get_rejection_reason,
     get_new_grievances, accept_grievance, reject_grievance,
     get_assigned_grievances, update_status, upload_workproof,
-    escalate_grievance, save_workproof_record
+    escalate_grievance, save_workproof_record, load_grievance, load_grievance_list,
+    paginate_grievances, parse_grievance_fields, dump_grievances
 )
+from ..utils.pagination import get_page_args, page_response
+from ..services.master_data_service import get_config_value
+from ..services.search_service import search_grievances
+from ..services.duplicate_service import find_duplicate_candidates
 
 from .. import db
-from ..services.grievance_service import log_audit
+from ..services.audit_service import log_audit
 from datetime import datetime, timezone
 
 grievance_bp = Blueprint('grievances', __name__)
@@ -32,31 +37,53 @@ def create_grievance(user):
         
         current_app.logger.info(f"Collected {len(files)} files for upload")
         if 'priority' not in data or not data['priority']:
-            default_priority = MasterConfig.query.filter_by(key='DEFAULT_PRIORITY').first()
-            data['priority'] = default_priority.value if default_priority else 'medium'
+            data['priority'] = get_config_value('DEFAULT_PRIORITY', 'medium')
         if "latitude" in data and data["latitude"]:
             data["latitude"] = float(data["latitude"])
         if "longitude" in data and data["longitude"]:
             data["longitude"] = float(data["longitude"])
 
         result = submit_grievance(user.id, data, files)
-        log_audit(f"Grievance created by user {user.id}", user.id, result.get('id'))
         return jsonify(result), 201
     except Exception as e:
         current_app.logger.error(f"Error creating grievance: {str(e)}")
         return jsonify({"msg": str(e)}), 400
 
+@grievance_bp.route('/duplicates', methods=['POST'])
+@citizen_required
+def check_duplicates(user):
+    try:
+        data = request.get_json() or {}
+        latitude, longitude = data.get('latitude'), data.get('longitude')
+        candidates = find_duplicate_candidates(
+            int(data['area_id']), int(data['subject_id']),
+            data.get('title', ''), data.get('description', ''),
+            float(latitude) if latitude not in (None, '') else None,
+            float(longitude) if longitude not in (None, '') else None,
+            citizen_id=user.id
+        )
+        return jsonify({'possible_duplicates': candidates}), 200
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({"msg": f"Invalid duplicate check data: {str(e)}"}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error checking duplicates: {str(e)}")
+        return jsonify({"msg": str(e)}), 500
+
 @grievance_bp.route('/mine', methods=['GET'])
 @citizen_or_admin_required
 def my_grievances(user):
     current_app.logger.info(f"Fetching grievances for user {user.id} with role {user.role}")
     try:
+        limit, cursor = get_page_args()
+        fields = parse_grievance_fields(request.args.get('view'), request.args.get('fields'))
         if user.role == Role.ADMIN or user.role == Role.MEMBER_HEAD:
-            grievances = Grievance.query.order_by(Grievance.created_at.desc()).all()  
+            grievances, next_cursor = paginate_grievances(Grievance.query, limit, cursor, fields)
         else:
-            grievances = Grievance.query.filter_by(citizen_id=user.id).order_by(Grievance.created_at.desc()).all()  
-            print(f"Fetched {[g.to_dict() for g in grievances]} grievances for user {user.id}")
-        return jsonify([grievance.to_dict() for grievance in grievances]), 200
+            grievances, next_cursor = paginate_grievances(Grievance.query.filter_by(citizen_id=user.id), limit, cursor, fields)
+        if fields:
+            return jsonify(page_response(dump_grievances(grievances, fields), limit, next_cursor)), 200
+        current_app.logger.debug(f"Fetched {len(grievances)} grievances for user {user.id}")
+        return jsonify(page_response([grievance.to_dict() for grievance in grievances], limit, next_cursor)), 200
     except Exception as e:
         current_app.logger.error(f"Error fetching grievances for user {user.id}: {str(e)}")
         return jsonify({"msg": str(e)}), 400
@@ -65,12 +92,11 @@ def my_grievances(user):
 @jwt_required_with_role([Role.CITIZEN, Role.MEMBER_HEAD, Role.FIELD_STAFF, Role.ADMIN])
 def get_grievance(user, id):
     current_app.logger.info(f"Fetching grievance ID {id} for user ID {user.id} with role {user.role}")
-    grievance = db.session.get(Grievance, id)
+    grievance = load_grievance(id)
     if not grievance:
         current_app.logger.error(f"Grievance ID {id} not found")
         return jsonify({"msg": "Grievance not found"}), 404
     schema = GrievanceSchema()
-    current_app.logger.info(f"Grievance found: {schema.dump(grievance)}")
     if user.role != Role.ADMIN and grievance.citizen_id != user.id:
         if user.role not in [Role.MEMBER_HEAD, Role.FIELD_STAFF] or grievance.assigned_to != user.id:
              current_app.logger.warning(f"Unauthorized access attempt for grievance {id} by user {user.id}")
@@ -94,7 +120,6 @@ def add_grievance_comment(user, id):
             return jsonify({"msg": "Comment text is required"}), 400
 
         result = add_comment(id, user.id, comment_text, files)
-        log_audit(f"Comment added to grievance {id}", user.id, id)
         return jsonify(result), 201
     except Exception as e:
         current_app.logger.error(f"Error adding comment to grievance {id}: {str(e)}")
@@ -105,7 +130,6 @@ def add_grievance_comment(user, id):
 def close_grievance(user, id):
     try:
         result = confirm_closure(id, user.id)
-        log_audit(f"Grievance {id} closed by user {user.id}", user.id, id)
         return jsonify(result), 200
     except Exception as e:
         current_app.logger.error(f"Error closing grievance {id}: {str(e)}")
@@ -125,9 +149,11 @@ def rejection_reason(user, id):
 @member_head_required
 def new_grievances(user):
     try:
-        result = get_new_grievances() 
+        limit, cursor = get_page_args()
+        fields = parse_grievance_fields(request.args.get('view'), request.args.get('fields'))
+        result, next_cursor = get_new_grievances(limit, cursor, fields)
         current_app.logger.info(f"New grievances for department: {len(result)} grievances found.")
-        return jsonify(result), 200
+        return jsonify(page_response(result, limit, next_cursor)), 200
     except Exception as e:
         current_app.logger.error(f"Error fetching new grievances for department : {str(e)}")
         return jsonify({"msg": str(e)}), 400
@@ -138,7 +164,6 @@ def accept(user, id):
     try:
         data = request.get_json()
         result = accept_grievance(id, user.id, data)
-        log_audit(f"Grievance {id} accepted by user {user.id}", user.id, id)
         return jsonify(result), 200
     except Exception as e:
         current_app.logger.error(f"Error accepting grievance {id}: {str(e)}")
@@ -157,7 +182,6 @@ def reject(user, id):
             return jsonify({"msg": "Rejection reason is required"}), 400
         result = reject_grievance(id, user.id, reason)
         current_app.logger.info(f"Result of rejection: {result}")
-        log_audit(f"Grievance {id} rejected by user {user.id}", user.id, id)
         return jsonify(result), 200
     except Exception as e:
         current_app.logger.error(f"Error rejecting grievance {id}: {str(e)}")
@@ -167,8 +191,10 @@ def reject(user, id):
 @field_staff_required
 def assigned_grievances(user):
     try:
-        result = get_assigned_grievances(user.id)
-        return jsonify(result), 200
+        limit, cursor = get_page_args()
+        fields = parse_grievance_fields(request.args.get('view'), request.args.get('fields'))
+        result, next_cursor = get_assigned_grievances(user.id, limit, cursor, fields)
+        return jsonify(page_response(result, limit, next_cursor)), 200
     except Exception as e:
         current_app.logger.error(f"Error fetching assigned grievances for user {user.id}: {str(e)}")
         return jsonify({"msg": str(e)}), 400
@@ -184,7 +210,7 @@ def get_assigned_grievances_by_user(user, user_id):
         if not target_user:
             return jsonify({"msg": "User not found"}), 404
 
-        grievances = Grievance.query.filter_by(assigned_to=user_id).all()
+        grievances = load_grievance_list(Grievance.query.filter_by(assigned_to=user_id))
         if not grievances:
             return jsonify({"msg": "No grievances assigned to this user"}), 404
 
@@ -215,9 +241,9 @@ def update_grievance_status(user, id):
         grievance.status = GrievanceStatus[new_status_str.upper()]
         if grievance.status == GrievanceStatus.RESOLVED:
             grievance.resolved_at = datetime.now(timezone.utc)
+        log_audit(f'Status updated from {old_status} to {grievance.status}', user.id, id)
         db.session.commit()
         print(f"Status updated from {old_status} to {grievance.status}")
-        log_audit(f'Status updated from {old_status} to {grievance.status}', user.id, id)
 
 
         schema = GrievanceSchema()
@@ -240,8 +266,6 @@ def upload_grievance_workproof(user, id):
         
         data = request.form
         result = save_workproof_record(id, user.id, file, data.get('notes'))
-        
-        log_audit(f"Workproof uploaded for grievance {id}", user.id, id)
         return jsonify(result), 201
     except Exception as e:
         current_app.logger.error(f"Error uploading workproof for grievance {id}: {str(e)}")
@@ -260,8 +284,8 @@ def submit_feedback(user, id):
             return jsonify({"msg": "Valid rating (1-5) is required"}), 400
         grievance.feedback_rating = rating
         grievance.feedback_text = data.get('feedback_text')
-        db.session.commit()
         log_audit(f"Feedback submitted for grievance {id}", user.id, id)
+        db.session.commit()
         return jsonify({"msg": "Feedback submitted successfully"}), 200
     except Exception as e:
         current_app.logger.error(f"Error submitting feedback for grievance {id}: {str(e)}")
@@ -282,11 +306,13 @@ def get_grievance_admin(user, id):
 @admin_required
 def get_all_grievances(user):
     try:
-        grievances = Grievance.query.order_by(Grievance.created_at.desc()).all()
+        limit, cursor = get_page_args()
+        fields = parse_grievance_fields(request.args.get('view'), request.args.get('fields'))
+        grievances, next_cursor = paginate_grievances(Grievance.query, limit, cursor, fields)
 
-        schema = GrievanceSchema(many=True)
-        log_audit(f"Admin {user.id} fetched all grievances", user.id, None)
-        return jsonify(schema.dump(grievances)), 200
+        result = dump_grievances(grievances, fields)
+        log_audit(f"Admin {user.id} fetched all grievances", user.id, None, commit=True)
+        return jsonify(page_response(result, limit, next_cursor)), 200
     except Exception as e:
         current_app.logger.error(f"Error fetching all grievances for admin {user.id}: {str(e)}")
         return jsonify({"msg": str(e)}), 400
@@ -308,8 +334,8 @@ def reassign_grievance(user, id):
             print("Assignee must have field staff role")
             return jsonify({"msg": "Assignee must have field staff role"}), 400
         grievance.assigned_to = assignee_id
-        db.session.commit()
         log_audit(f"Grievance {id} reassigned to user {assignee_id}", user.id, id)
+        db.session.commit()
         return jsonify({"msg": "Grievance reassigned successfully"}), 200
     except Exception as e:
         current_app.logger.error(f"Error reassigning grievance {id}: {str(e)}")
@@ -317,13 +343,39 @@ def reassign_grievance(user, id):
 
 @grievance_bp.route('/<int:id>/escalate', methods=['POST'])
 @admin_required
-def escalate_grievance(user, id):
+def escalate(user, id):
     try:
         result = escalate_grievance(id, user.id)
-        log_audit(f"Grievance {id} escalated by user {user.id}", user.id, id)
-        return jsonify(result), 200 if result['success'] else 404
+        return jsonify(result), 200 if result['success'] else 400
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 404 if str(e) == "Grievance not found" else 400
     except Exception as e:
         current_app.logger.error(f"Error escalating grievance {id}: {str(e)}")
+        return jsonify({"msg": str(e)}), 500
+
+@grievance_bp.route('/search', methods=['GET'])
+@jwt_required_with_role([Role.CITIZEN, Role.MEMBER_HEAD, Role.FIELD_STAFF, Role.ADMIN])
+def search(user):
+    try:
+        limit, cursor = get_page_args()
+        limit = limit or current_app.config.get('DEFAULT_PAGE_SIZE', 50)
+        fields = parse_grievance_fields(request.args.get('view'), request.args.get('fields'))
+        ids, next_cursor = search_grievances(
+            request.args.get('q'), limit, cursor,
+            citizen_id=user.id if user.role == Role.CITIZEN else None,
+            status=request.args.get('status'),
+            area_id=request.args.get('area_id', type=int)
+        )
+        loaded = load_grievance_list(Grievance.query.filter(Grievance.id.in_(ids)), fields) if ids else []
+        by_id = {grievance.id: grievance for grievance in loaded}
+        grievances = [by_id[id] for id in ids if id in by_id]
+        if fields:
+            return jsonify(page_response(dump_grievances(grievances, fields), limit, next_cursor)), 200
+        return jsonify(page_response([grievance.to_dict() for grievance in grievances], limit, next_cursor)), 200
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+    except Exception as e:
+        current_app.logger.error(f"Error searching grievances: {str(e)}")
         return jsonify({"msg": str(e)}), 400
 
 @grievance_bp.route('/search/<string:complaint_id>', methods=['GET'])
@@ -346,25 +398,27 @@ def search_grievance_by_complaint_id(user, complaint_id):
 def track_grievances(user):
     try:
         current_app.logger.info(f"Track grievances called for user ID {user.id}")
-        grievances = Grievance.query.filter_by(citizen_id=user.id).order_by(Grievance.created_at.desc()).all()
-
-        schema = GrievanceSchema(many=True)
+        limit, cursor = get_page_args()
+        fields = parse_grievance_fields(request.args.get('view'), request.args.get('fields'))
+        grievances, next_cursor = paginate_grievances(Grievance.query.filter_by(citizen_id=user.id), limit, cursor, fields)
+
+        grievances_data = dump_grievances(grievances, fields)
+        if not fields:
+            for grievance in grievances_data:
+                grievance['id'] = grievance.get('id') or 0
+                grievance['citizen_id'] = grievance.get('citizen_id') or user.id
+                grievance['subject_id'] = grievance.get('subject_id') or 0
+                grievance['area_id'] = grievance.get('area_id') or 0
+                grievance['title'] = grievance.get('title') or 'Untitled Grievance'
+                grievance['description'] = grievance.get('description') or 'No description provided'
+                grievance['complaint_id'] = grievance.get('complaint_id') or str(uuid.uuid4())[:8]
+                grievance['citizen'] = grievance.get('citizen') or {'id': 0, 'name': 'Unknown User'}
+                grievance['assignee'] = grievance.get('assignee') or {'id': 0, 'name': 'Unassigned'}
+                if grievance.get('assigned_to') is None:
+                    grievance['assigned_to'] = 0
         
-        grievances_data = schema.dump(grievances)
-        for grievance in grievances_data:
-            grievance['id'] = grievance.get('id') or 0
-            grievance['citizen_id'] = grievance.get('citizen_id') or user.id
-            grievance['subject_id'] = grievance.get('subject_id') or 0
-            grievance['area_id'] = grievance.get('area_id') or 0
-            grievance['title'] = grievance.get('title') or 'Untitled Grievance'
-            grievance['description'] = grievance.get('description') or 'No description provided'
-            grievance['complaint_id'] = grievance.get('complaint_id') or str(uuid.uuid4())[:8]
-            grievance['citizen'] = grievance.get('citizen') or {'id': 0, 'name': 'Unknown User'}
-            grievance['assignee'] = grievance.get('assignee') or {'id': 0, 'name': 'Unassigned'}
-            if grievance.get('assigned_to') is None:
-                grievance['assigned_to'] = 0
         
-        return jsonify(grievances_data), 200
+        return jsonify(page_response(grievances_data, limit, next_cursor)), 200
     except Exception as e:
         current_app.logger.error(f"Error tracking grievances for user {user.id}: {str(e)}")
         return jsonify({"msg": str(e)}), 400
@@ -413,6 +467,6 @@ def delete_grievance(user, grievance_id):
         return jsonify({"msg": "Permission denied to delete this grievance"}), 403
 
     db.session.delete(grievance)
-    db.session.commit()
     log_audit(f"Grievance {grievance_id} deleted by user {user.id}", user.id, grievance_id)
+    db.session.commit()
     return jsonify({"message": "Grievance deleted successfully"})
\ No newline at end of file
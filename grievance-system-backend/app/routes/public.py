@@ -2,30 +2,45 @@
 from flask import Blueprint, jsonify
 from ..models import MasterSubjects, MasterAreas, Advertisement
 from .. import db
+from ..services.master_data_service import get_master_data, get_master_version, get_master_versions
+from ..utils.http_cache import conditional_response, table_version
 
 public_bp = Blueprint('public', __name__)
 
 @public_bp.route('/subjects', methods=['GET'])
 def get_subjects():
-    subjects = MasterSubjects.query.all()
-    return jsonify([{'id': s.id, 'name': s.name, 'description': s.description} for s in subjects])
+    def build():
+        subjects = get_master_data('subjects')
+        return jsonify([{'id': s['id'], 'name': s['name'], 'description': s['description']} for s in subjects])
+    return conditional_response(get_master_version('subjects'), build)
 
 @public_bp.route('/areas', methods=['GET'])
 def get_areas():
-    areas = MasterAreas.query.all()
-    return jsonify([{'id': a.id, 'name': a.name, 'description': a.description} for a in areas])
+    def build():
+        areas = get_master_data('areas')
+        return jsonify([{'id': a['id'], 'name': a['name'], 'description': a['description']} for a in areas])
+    return conditional_response(get_master_version('areas'), build)
+
+@public_bp.route('/master-data/versions', methods=['GET'])
+def get_master_data_versions():
+    return jsonify(get_master_versions())
 
 
 @public_bp.route('/advertisements', methods=['GET'])
 def get_advertisements():
     try:
-        ads = Advertisement.query.filter_by(is_active=True).order_by(Advertisement.created_at.desc()).all()
-        ads_data = [ad.to_dict() for ad in ads]
-        return jsonify({
-            'success': True,
-            'data': ads_data,
-            'count': len(ads_data)
-        }), 200
+        active_ads = Advertisement.query.filter_by(is_active=True)
+        version, last_modified = table_version(active_ads, Advertisement.id, Advertisement.updated_at)
+
+        def build():
+            ads = active_ads.order_by(Advertisement.created_at.desc()).all()
+            ads_data = [ad.to_dict() for ad in ads]
+            return jsonify({
+                'success': True,
+                'data': ads_data,
+                'count': len(ads_data)
+            }), 200
+        return conditional_response(version, build, last_modified)
     except Exception as e:
         db.session.rollback()
         return jsonify({
@@ -143,6 +143,7 @@ class AnnouncementSchema(Schema):
     message = fields.Str(required=True)
     type = fields.Str(required=True, validate=validate.OneOf(["general", "emergency"]))
     created_at = fields.DateTime(dump_only=True)
+    updated_at = fields.DateTime(dump_only=True)
     expires_at = fields.DateTime(allow_none=True)  
     target_role = fields.Str(allow_none=True, validate=validate.OneOf([r.value for r in Role]))
     is_active = fields.Boolean()  
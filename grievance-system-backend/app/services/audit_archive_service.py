@@ -0,0 +1,122 @@
+import gzip
+import json
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import select, delete
+from ..models import AuditLog
+from ..utils.pagination import encode_cursor, decode_cursor, unpaginated
+from .audit_service import parse_audit_filters
+from .master_data_service import get_config_value
+from .. import db
+
+_MONTH = re.compile(r'^\d{4}-\d{2}$')
+_FILE_NAME = re.compile(r'^audit_log_(\d{4}-\d{2})\.jsonl\.gz$')
+_COLUMNS = [column.key for column in AuditLog.__table__.columns]
+
+def archive_dir():
+    path = current_app.config['AUDIT_ARCHIVE_FOLDER']
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def _archive_path(month):
+    return os.path.join(archive_dir(), f"audit_log_{month}.jsonl.gz")
+
+def get_retention_days():
+    try:
+        return int(get_config_value('AUDIT_RETENTION_DAYS', current_app.config.get('AUDIT_RETENTION_DAYS', 90)))
+    except (TypeError, ValueError):
+        return current_app.config.get('AUDIT_RETENTION_DAYS', 90)
+
+def _entry(row):
+    entry = dict(zip(_COLUMNS, row))
+    if entry['timestamp'] is not None:
+        entry['timestamp'] = entry['timestamp'].isoformat()
+    return entry
+
+def archive_audit_logs(retention_days=None, batch_size=5000):
+    """
+    Move audit rows older than the retention window (MasterConfig
+    AUDIT_RETENTION_DAYS) into one gzipped JSONL file per month under
+    AUDIT_ARCHIVE_FOLDER. Each batch is appended to its files before its rows
+    are deleted, so a crash can only duplicate entries, never lose them.
+    Returns {month: rows archived}.
+    """
+    if retention_days is None:
+        retention_days = get_retention_days()
+    # 0 or less would move the whole live log, including today's entries
+    if retention_days < 1:
+        raise ValueError("retention_days must be at least 1")
+    cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=retention_days)
+    table = AuditLog.__table__
+    archived = {}
+    while True:
+        rows = db.session.execute(
+            select(table).where(table.c.timestamp < cutoff).order_by(table.c.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        by_month = {}
+        for row in rows:
+            entry = _entry(row)
+            by_month.setdefault(entry['timestamp'][:7], []).append(entry)
+        for month, entries in by_month.items():
+            with gzip.open(_archive_path(month), 'at', encoding='utf-8') as f:
+                for entry in entries:
+                    f.write(json.dumps(entry) + '\n')
+            archived[month] = archived.get(month, 0) + len(entries)
+        db.session.execute(delete(table).where(table.c.id.in_([row.id for row in rows])))
+        db.session.commit()
+    return archived
+
+def list_archive_months():
+    return sorted(
+        (match.group(1) for match in map(_FILE_NAME.match, os.listdir(archive_dir())) if match),
+        reverse=True
+    )
+
+def _matches(entry, filters):
+    for name in ('performed_by', 'grievance_id', 'action_type'):
+        if name in filters and entry[name] != filters[name]:
+            return False
+    timestamp = datetime.fromisoformat(entry['timestamp'])
+    if 'since' in filters and timestamp < filters['since']:
+        return False
+    if 'until' in filters and timestamp >= filters['until']:
+        return False
+    return True
+
+def query_audit_archive(month, filters=None, limit=None, cursor=None):
+    """
+    Archived entries of one month, newest first, with the same filters and
+    (timestamp, id) cursor as the live audit log. Returns (entries, next_cursor).
+    """
+    if not _MONTH.match(month or ''):
+        raise ValueError("month must be in YYYY-MM format")
+    filters = parse_audit_filters(**(filters or {}))
+    path = _archive_path(month)
+    if not os.path.exists(path):
+        return [], None
+
+    after = decode_cursor(cursor) if cursor else None
+    # keyed by id: a batch re-archived after a crash appears twice in the file
+    entries = {}
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            entry = json.loads(line)
+            if _matches(entry, filters):
+                entries[entry['id']] = entry
+    keyed = sorted(
+        (((datetime.fromisoformat(e['timestamp']), e['id']), e) for e in entries.values()),
+        key=lambda item: item[0],
+        reverse=True
+    )
+    if after:
+        keyed = [item for item in keyed if item[0] < after]
+    if limit is None:
+        return unpaginated([e for _, e in keyed]), None
+    if len(keyed) <= limit:
+        return [e for _, e in keyed], None
+    keyed = keyed[:limit]
+    return [e for _, e in keyed], encode_cursor(*keyed[-1][0])
@@ -0,0 +1,137 @@
+import atexit
+import queue
+import threading
+from datetime import datetime, timezone
+from flask import current_app
+from sqlalchemy import insert
+from sqlalchemy.orm import joinedload
+from ..models import AuditLog
+from ..utils.pagination import keyset_paginate
+from ..utils.db_routing import read_from_replica
+from .. import db
+
+AUDIT_FILTERS = ('performed_by', 'grievance_id', 'action_type', 'since', 'until')
+
+_buffer = queue.Queue()
+_flush_requested = threading.Event()
+_flusher = None
+_flusher_lock = threading.Lock()
+
+def log_audit(action, user_id, grievance_id=None, action_type=None, details=None, commit=False):
+    """
+    Record an audit entry. By default the row is added to the current session
+    and written by the caller's own commit, so a change and its audit entry
+    share one transaction; pass commit=True when there is nothing else to commit.
+
+    With AUDIT_LOG_MODE = 'buffered' entries are queued instead and inserted in
+    bulk by a background thread. That takes audit writes off the request path,
+    at the cost of losing queued entries if the process dies.
+    """
+    entry = {
+        'action': action,
+        'action_type': action_type,
+        'performed_by': user_id,
+        'grievance_id': grievance_id,
+        'details': details,
+        'timestamp': datetime.now(timezone.utc),
+    }
+    if current_app.config.get('AUDIT_LOG_MODE') == 'buffered':
+        _buffer.put(entry)
+        _ensure_flusher(current_app._get_current_object())
+        if _buffer.qsize() >= current_app.config.get('AUDIT_BUFFER_SIZE', 500):
+            _flush_requested.set()
+        return
+    try:
+        db.session.add(AuditLog(**entry))
+        if commit:
+            db.session.commit()
+    except Exception as e:
+        current_app.logger.error(f"Error logging audit for action {action}: {str(e)}")
+        raise
+
+def flush_audit_buffer(app):
+    """Insert every queued audit entry in one statement. Returns the count."""
+    rows = []
+    while True:
+        try:
+            rows.append(_buffer.get_nowait())
+        except queue.Empty:
+            break
+    if not rows:
+        return 0
+    with app.app_context():
+        try:
+            db.session.execute(insert(AuditLog), rows)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            app.logger.error(f"Dropped {len(rows)} buffered audit entries: {str(e)}")
+            return 0
+        finally:
+            db.session.remove()
+    return len(rows)
+
+def _flush_loop(app):
+    while True:
+        _flush_requested.wait(app.config.get('AUDIT_FLUSH_INTERVAL', 1.0))
+        _flush_requested.clear()
+        flush_audit_buffer(app)
+
+def _ensure_flusher(app):
+    global _flusher
+    if _flusher is not None:
+        return
+    with _flusher_lock:
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, args=(app,), name='audit-flush', daemon=True)
+            _flusher.start()
+            atexit.register(flush_audit_buffer, app)
+
+def _parse_time(value, name):
+    try:
+        parsed = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an ISO 8601 datetime")
+    # timestamps are stored as naive UTC
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _parse_int(value, name):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be an integer")
+
+def parse_audit_filters(performed_by=None, grievance_id=None, action_type=None, since=None, until=None):
+    """Typed audit filters from raw query-string values; unset filters are dropped."""
+    parsed = {
+        'performed_by': _parse_int(performed_by, 'performed_by') if performed_by is not None else None,
+        'grievance_id': _parse_int(grievance_id, 'grievance_id') if grievance_id is not None else None,
+        'action_type': action_type or None,
+        'since': _parse_time(since, 'since') if since else None,
+        'until': _parse_time(until, 'until') if until else None,
+    }
+    return {name: value for name, value in parsed.items() if value is not None}
+
+def filter_audit_logs(query, **filters):
+    """Apply the audit log filters; values may be raw query-string strings."""
+    filters = parse_audit_filters(**filters)
+    for name in ('performed_by', 'grievance_id', 'action_type'):
+        if name in filters:
+            query = query.filter(getattr(AuditLog, name) == filters[name])
+    if 'since' in filters:
+        query = query.filter(AuditLog.timestamp >= filters['since'])
+    if 'until' in filters:
+        query = query.filter(AuditLog.timestamp < filters['until'])
+    return query
+
+@read_from_replica
+def get_audit_logs(filters=None, limit=None, cursor=None):
+    """
+    Audit entries newest first, keyset-paginated on (timestamp, id).
+    Returns (logs, next_cursor).
+    """
+    query = filter_audit_logs(AuditLog.query, **(filters or {}))
+    query = query.options(joinedload(AuditLog.performer))
+    return keyset_paginate(query, AuditLog.timestamp, AuditLog.id, limit, cursor)
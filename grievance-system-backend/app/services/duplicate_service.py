@@ -0,0 +1,112 @@
+import math
+import re
+from flask import current_app
+from .master_data_service import get_config_value
+from ..models import Grievance, GrievanceStatus
+from .. import db
+
+OPEN_STATUSES = [GrievanceStatus.NEW, GrievanceStatus.IN_PROGRESS, GrievanceStatus.ON_HOLD]
+METERS_PER_DEGREE = 111320.0
+_WORD = re.compile(r'[\w\u0900-\u097F]+')
+
+def _config_number(key, cast):
+    default = current_app.config.get(key)
+    try:
+        return cast(get_config_value(key, default))
+    except (TypeError, ValueError):
+        return default
+
+def get_duplicate_radius_meters():
+    return _config_number('DUPLICATE_RADIUS_METERS', float)
+
+def get_duplicate_similarity_threshold():
+    return _config_number('DUPLICATE_SIMILARITY_THRESHOLD', float)
+
+def trigrams(text):
+    """Character trigrams of each word, padded so short words still count."""
+    grams = set()
+    for word in _WORD.findall((text or '').lower()):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def similarity(a, b):
+    """Jaccard similarity of two trigram sets, 0.0 - 1.0."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def distance_meters(lat1, lng1, lat2, lng2):
+    """Haversine distance."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi, d_lambda = phi2 - phi1, math.radians(lng2 - lng1)
+    h = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * 6371008.8 * math.asin(math.sqrt(min(1.0, h)))
+
+def mask_title(title, known_text):
+    """Keep only the words the viewer already typed; the rest become '…'."""
+    known = {word.lower() for word in _WORD.findall(known_text or '')}
+    masked = [word if word.lower() in known else '…' for word in _WORD.findall(title or '')]
+    return re.sub(r'…( …)+', '…', ' '.join(masked))
+
+def find_duplicate_candidates(area_id, subject_id, title, description, latitude, longitude,
+                              exclude_id=None, citizen_id=None):
+    """
+    Open grievances in the same area and subject within DUPLICATE_RADIUS_METERS
+    whose title/description look like the submission, most similar first.
+    The ix_grievance_area_subject_status_latitude index turns the radius into a
+    latitude range, so only grievances in that band are read; trigram
+    similarity is then computed on those few rows in Python. Submissions
+    without coordinates are not checked.
+
+    With `citizen_id`, only that citizen's own grievances are returned in full;
+    for anyone else's the citizen sees distance, similarity and a masked title,
+    nothing that identifies or fetches the other grievance.
+    """
+    if not current_app.config.get('DUPLICATE_DETECTION_ENABLED', True):
+        return []
+    if latitude is None or longitude is None or area_id is None or subject_id is None:
+        return []
+    radius = get_duplicate_radius_meters()
+    threshold = get_duplicate_similarity_threshold()
+    d_lat = radius / METERS_PER_DEGREE
+    d_lng = radius / (METERS_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+
+    query = db.session.query(
+        Grievance.id, Grievance.complaint_id, Grievance.citizen_id, Grievance.title, Grievance.description,
+        Grievance.status, Grievance.latitude, Grievance.longitude, Grievance.created_at
+    ).filter(
+        Grievance.area_id == area_id,
+        Grievance.subject_id == subject_id,
+        Grievance.latitude.between(latitude - d_lat, latitude + d_lat),
+        Grievance.longitude.between(longitude - d_lng, longitude + d_lng),
+        Grievance.status.in_(OPEN_STATUSES),
+    )
+    if exclude_id is not None:
+        query = query.filter(Grievance.id != exclude_id)
+    rows = query.limit(current_app.config.get('DUPLICATE_SCAN_LIMIT', 500)).all()
+
+    submitted = trigrams(f"{title} {description}")
+    candidates = []
+    for row in rows:
+        distance = distance_meters(latitude, longitude, row.latitude, row.longitude)
+        if distance > radius:
+            continue
+        score = similarity(submitted, trigrams(f"{row.title} {row.description}"))
+        if score < threshold:
+            continue
+        candidate = {'distance_meters': round(distance, 1), 'similarity': round(score, 3)}
+        if citizen_id is None or row.citizen_id == citizen_id:
+            candidate.update(
+                own=citizen_id is not None,
+                id=row.id,
+                complaint_id=row.complaint_id,
+                title=row.title,
+                status=row.status.value,
+                created_at=row.created_at.isoformat() if row.created_at else None,
+            )
+        else:
+            candidate.update(own=False, title=mask_title(row.title, f"{title} {description}"))
+        candidates.append(candidate)
+    candidates.sort(key=lambda candidate: (-candidate['similarity'], candidate['distance_meters']))
+    return candidates[:current_app.config.get('DUPLICATE_MAX_CANDIDATES', 5)]
@@ -0,0 +1,114 @@
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import update, insert, func, and_, or_, true
+from ..models import Grievance, GrievanceStatus, Priority, AuditLog
+from .master_data_service import get_master_data, get_config_value
+from .. import db
+
+# Statuses still waiting on staff; RESOLVED waits on the citizen and is auto-closed instead
+ESCALATION_STATUSES = [GrievanceStatus.NEW, GrievanceStatus.IN_PROGRESS, GrievanceStatus.ON_HOLD]
+# MasterConfig keys: ESCALATION_HOURS, ESCALATION_HOURS_<PRIORITY>, ESCALATION_HOURS_SUBJECT_<id>
+ESCALATION_KEY = 'ESCALATION_HOURS'
+_SUBJECT_PREFIX = ESCALATION_KEY + '_SUBJECT_'
+
+def _hours(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def get_max_escalation_level():
+    default = current_app.config.get('MAX_ESCALATION_LEVEL', 3)
+    try:
+        return int(get_config_value('MAX_ESCALATION_LEVEL', default))
+    except (TypeError, ValueError):
+        return default
+
+def get_escalation_thresholds():
+    """
+    (default_hours, {Priority: hours}, {subject_id: hours}) from MasterConfig.
+    A subject threshold wins over a priority one, which wins over the default.
+    """
+    default = current_app.config.get('ESCALATION_HOURS', 72)
+    by_priority, by_subject = {}, {}
+    priorities = {f"{ESCALATION_KEY}_{p.name}": p for p in Priority}
+    for config in get_master_data('configs'):
+        key, hours = config['key'], _hours(config['value'])
+        if hours is None:
+            continue
+        if key == ESCALATION_KEY:
+            default = hours
+        elif key in priorities:
+            by_priority[priorities[key]] = hours
+        elif key.startswith(_SUBJECT_PREFIX) and key[len(_SUBJECT_PREFIX):].isdigit():
+            by_subject[int(key[len(_SUBJECT_PREFIX):])] = hours
+    return default, by_priority, by_subject
+
+def escalation_rules():
+    """
+    Disjoint (condition, hours) pairs covering every grievance, one per
+    distinct threshold, so each becomes a single UPDATE. Rules with a
+    threshold of 0 or less are left out, which turns escalation off for them.
+    """
+    default, by_priority, by_subject = get_escalation_thresholds()
+    rules = []
+    subjects_by_hours = {}
+    for subject_id, hours in by_subject.items():
+        subjects_by_hours.setdefault(hours, []).append(subject_id)
+    for hours, subject_ids in subjects_by_hours.items():
+        rules.append((Grievance.subject_id.in_(subject_ids), hours))
+
+    other_subjects = Grievance.subject_id.notin_(list(by_subject)) if by_subject else true()
+    priorities_by_hours = {}
+    for priority, hours in by_priority.items():
+        priorities_by_hours.setdefault(hours, []).append(priority)
+    for hours, priorities in priorities_by_hours.items():
+        rules.append((and_(other_subjects, Grievance.priority.in_(priorities)), hours))
+
+    other_priorities = or_(Grievance.priority.is_(None), Grievance.priority.notin_(list(by_priority))) if by_priority else true()
+    rules.append((and_(other_subjects, other_priorities), default))
+    return [(condition, hours) for condition, hours in rules if hours > 0]
+
+def escalate_overdue_grievances(audit_batch_size=5000):
+    """
+    Escalate every pending grievance left untouched past its threshold by one
+    level, one UPDATE ... RETURNING per rule, and audit them with bulk inserts
+    in the same transaction. Bumping updated_at restarts the clock, so the next
+    level follows after another full threshold. Returns the number escalated.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    max_level = get_max_escalation_level()
+    below_max = or_(Grievance.escalation_level.is_(None), Grievance.escalation_level < max_level)
+    escalated = []
+    for condition, hours in escalation_rules():
+        escalated += db.session.execute(
+            update(Grievance)
+            .where(
+                Grievance.status.in_(ESCALATION_STATUSES),
+                Grievance.updated_at < now - timedelta(hours=hours),
+                below_max,
+                condition,
+            )
+            .values(escalation_level=func.coalesce(Grievance.escalation_level, 0) + 1, updated_at=now)
+            .returning(Grievance.id, Grievance.escalation_level, Grievance.assigned_to, Grievance.citizen_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+    if not escalated:
+        return 0
+
+    rows = [
+        {
+            'action': f'Auto-escalated to level {row.escalation_level} (SLA breached)',
+            'action_type': 'auto_escalate',
+            'performed_by': row.assigned_to or row.citizen_id,
+            'grievance_id': row.id,
+            'timestamp': now,
+        }
+        for row in escalated
+    ]
+    for start in range(0, len(rows), audit_batch_size):
+        db.session.execute(insert(AuditLog), rows[start:start + audit_batch_size])
+    # only open grievances move and none of their rollup buckets change, so no rollup refresh
+    db.session.commit()
+    current_app.logger.info(f"Auto-escalated {len(escalated)} grievances past SLA")
+    return len(escalated)
@@ -1,15 +1,90 @@
 from datetime import datetime, timedelta, timezone
 from flask import current_app
 from marshmallow import ValidationError
-from ..models import Grievance, GrievanceAttachment, GrievanceComment, Workproof, GrievanceStatus, Priority, AuditLog, User, Role, CommentAttachment
+from ..models import Grievance, GrievanceAttachment, GrievanceComment, Workproof, GrievanceStatus, Priority, AuditLog, User, Role, CommentAttachment, MasterSubjects
 from ..schemas import GrievanceSchema, GrievanceAttachmentSchema, GrievanceCommentSchema, WorkproofSchema
 from ..utils.file_utils import upload_files, upload_workproof
+from ..utils.pagination import keyset_paginate
+from .audit_service import log_audit
+from .escalation_service import get_max_escalation_level
+from .duplicate_service import find_duplicate_candidates
 from .. import db
 from ..config import Config
 
-from flask_jwt_extended import get_jwt_identity
 from werkzeug.utils import secure_filename
+from sqlalchemy.orm import joinedload, selectinload, load_only
 import os
+
+# Loader options for list endpoints, keyed by the serialized relation: many-to-one
+# relations are joined into the main SELECT and each collection is fetched with
+# one IN query for the whole page.
+GRIEVANCE_RELATION_OPTIONS = {
+    'citizen': (joinedload(Grievance.citizen),),
+    'assignee': (joinedload(Grievance.assignee),),
+    'assigner': (joinedload(Grievance.assigner),),
+    'subject': (joinedload(Grievance.subject).joinedload(MasterSubjects.category),),
+    'area': (joinedload(Grievance.area),),
+    'category': (joinedload(Grievance.category),),
+    'attachments': (selectinload(Grievance.attachments),),
+    'comments': (
+        selectinload(Grievance.comments).joinedload(GrievanceComment.user),
+        selectinload(Grievance.comments).selectinload(GrievanceComment.attachments),
+    ),
+    'workproofs': (selectinload(Grievance.workproofs).joinedload(Workproof.uploader),),
+}
+GRIEVANCE_LIST_OPTIONS = tuple(opt for opts in GRIEVANCE_RELATION_OPTIONS.values() for opt in opts)
+
+# Fields shown by the mobile list screens (?view=summary)
+GRIEVANCE_SUMMARY_FIELDS = ('id', 'complaint_id', 'title', 'status', 'priority', 'area', 'created_at')
+
+def parse_grievance_fields(view=None, fields=None):
+    """
+    Resolve ?view=summary or ?fields=a,b,c into a tuple of GrievanceSchema field
+    names. Returns None when the full representation was requested.
+    """
+    if fields:
+        requested = tuple(dict.fromkeys(f.strip() for f in fields.split(',') if f.strip()))
+    elif view == 'summary':
+        requested = GRIEVANCE_SUMMARY_FIELDS
+    elif view in (None, '', 'full'):
+        return None
+    else:
+        raise ValueError("Invalid view. Must be one of ['full', 'summary']")
+
+    allowed = [name for name, field in GrievanceSchema().fields.items() if not field.load_only]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown or not requested:
+        raise ValueError(f"Invalid fields {unknown}. Must be among {allowed}")
+    return requested
+
+def _sparse_options(fields):
+    # id and created_at are always needed for keyset pagination
+    columns = {'id', 'created_at'} | {f for f in fields if f not in GRIEVANCE_RELATION_OPTIONS}
+    options = [load_only(*[getattr(Grievance, c) for c in sorted(columns)])]
+    for field in fields:
+        options.extend(GRIEVANCE_RELATION_OPTIONS.get(field, ()))
+    return options
+
+def load_grievance_list(query, fields=None):
+    """
+    Run a Grievance query with all relations needed for serialization batch-loaded.
+    With `fields`, only those columns and relations are selected.
+    """
+    options = _sparse_options(fields) if fields else GRIEVANCE_LIST_OPTIONS
+    return query.options(*options).all()
+
+def load_grievance(id):
+    """One grievance with everything GrievanceSchema serializes batch-loaded, or None."""
+    return Grievance.query.options(*GRIEVANCE_LIST_OPTIONS).filter(Grievance.id == id).one_or_none()
+
+def paginate_grievances(query, limit=None, cursor=None, fields=None):
+    """Newest-first keyset page of `query` on (created_at, id). Returns (grievances, next_cursor)."""
+    return keyset_paginate(query, Grievance.created_at, Grievance.id, limit, cursor,
+                           loader=lambda q: load_grievance_list(q, fields))
+
+def dump_grievances(grievances, fields=None):
+    return GrievanceSchema(many=True, only=fields).dump(grievances)
+
 def submit_grievance(citizen_id, data, files):
     try:
         schema = GrievanceSchema()
@@ -19,6 +94,14 @@ def submit_grievance(citizen_id, data, files):
             current_app.logger.error(f"Validation error in submit_grievance: {err.messages}")
             raise ValueError(f"Invalid grievance data: {err.messages}")
 
+        # Looked up before the insert; the citizen is shown these, not blocked by them
+        possible_duplicates = find_duplicate_candidates(
+            validated_data['area_id'], validated_data['subject_id'],
+            validated_data['title'], validated_data['description'],
+            validated_data.get('latitude'), validated_data.get('longitude'),
+            citizen_id=citizen_id
+        )
+
         grievance = Grievance(
             citizen_id=citizen_id,
             subject_id=validated_data['subject_id'],
@@ -50,13 +133,12 @@ def submit_grievance(citizen_id, data, files):
                 current_app.logger.error(f"File upload failed for grievance {grievance.id}: {str(e)}")
                 raise ValueError(f"File upload error: {str(e)}")
 
-        db.session.commit()
-
         log_audit(f'Grievance created (Complaint ID {grievance.complaint_id})', citizen_id, grievance.id)
+        db.session.commit()
 
-        
-        
-        return schema.dump(grievance)
+        result = schema.dump(grievance)
+        result['possible_duplicates'] = possible_duplicates
+        return result
     except ValidationError as e:
         current_app.logger.error(f"Validation error in submit_grievance: {str(e.messages)}")
         raise ValueError(f"Invalid grievance data: {str(e.messages)}")
@@ -74,7 +156,7 @@ def submit_grievance(citizen_id, data, files):
 
 def get_my_grievances(citizen_id):
     try:
-        grievances = Grievance.query.filter_by(citizen_id=citizen_id).all()
+        grievances = load_grievance_list(Grievance.query.filter_by(citizen_id=citizen_id))
         schema = GrievanceSchema(many=True)
         return schema.dump(grievances)
     except Exception as e:
@@ -83,7 +165,7 @@ def get_my_grievances(citizen_id):
 
 def get_grievance_details(id, user_id):
     try:
-        grievance = db.session.get(Grievance, id)
+        grievance = load_grievance(id)
         if not grievance:
             current_app.logger.error(f"Grievance {id} not found")
             return None
@@ -97,7 +179,6 @@ def get_grievance_details(id, user_id):
             current_app.logger.error(f"User {user_id} not authorized to view grievance {id}")
             return None
 
-        _check_auto_close(grievance)
         schema = GrievanceSchema()
         return schema.dump(grievance)
     except Exception as e:
@@ -128,6 +209,7 @@ def add_comment(grievance_id, user_id, comment_text, files=None):
             )
             db.session.add(attachment)
 
+    log_audit(f"Comment added to grievance {grievance_id}", user_id, grievance_id)
     db.session.commit()
     return GrievanceCommentSchema().dump(comment)
 
@@ -139,8 +221,8 @@ def confirm_closure(id, citizen_id):
             raise ValueError("Invalid operation")
         grievance.status = GrievanceStatus.CLOSED
         grievance.updated_at = datetime.now(timezone.utc)
-        db.session.commit()
         log_audit('Grievance closed', citizen_id, id)
+        db.session.commit()
         
         return {"msg": "Closed"}
     except Exception as e:
@@ -158,31 +240,30 @@ def get_rejection_reason(id, citizen_id):
         current_app.logger.error(f"Error fetching rejection reason for grievance {id}: {str(e)}")
         raise
 
-def get_new_grievances():
+def get_new_grievances(limit=None, cursor=None, fields=None):
     try:
-        grievances = Grievance.query.order_by(Grievance.created_at.desc()).all()
+        grievances, next_cursor = paginate_grievances(Grievance.query, limit, cursor, fields)
         
-        schema = GrievanceSchema(many=True)
-        return schema.dump(grievances)
+        return dump_grievances(grievances, fields), next_cursor
     except Exception as e:
         current_app.logger.error(f"Error fetching new grievances for department : {str(e)}")
         raise
 
 def accept_grievance(id, head_id, data):
     try:
-        current_user_id = get_jwt_identity()
-        head_user = db.session.get(User, current_user_id)
+        # fresh, not the user cache: a head moved to another area must lose the old one at once
+        head_user = db.session.get(User, head_id)
         grievance = db.session.get(Grievance, id)
 
-        if not grievance or grievance.status != GrievanceStatus.NEW or grievance.area_id != head_user.department_id:
+        if not grievance or not head_user or grievance.status != GrievanceStatus.NEW or grievance.area_id != head_user.department_id:
             current_app.logger.error(f"Invalid accept attempt for grievance {id} by user {head_id}")
             raise ValueError("Invalid operation")
         grievance.priority = Priority[data['priority']]
         grievance.assigned_to = data['assigned_to']
         grievance.assigned_by = head_id
         grievance.status = GrievanceStatus.IN_PROGRESS
-        db.session.commit()
         log_audit('Grievance accepted and assigned', head_id, id)
+        db.session.commit()
      
         return {"msg": "Accepted"}
     except Exception as e:
@@ -195,19 +276,18 @@ def reject_grievance(id, head_id, reason):
         grievance = db.session.get(Grievance, id)
         grievance.status = GrievanceStatus.REJECTED
         grievance.rejection_reason = reason
-        db.session.commit()
         log_audit('Grievance rejected', head_id, id)
+        db.session.commit()
        
         return {"msg": "Rejected"}
     except Exception as e:
         current_app.logger.error(f"Error rejecting grievance {id}: {str(e)}")
         raise
 
-def get_assigned_grievances(employer_id):
+def get_assigned_grievances(employer_id, limit=None, cursor=None, fields=None):
     try:
-        grievances = Grievance.query.filter_by(assigned_to=employer_id).all()
-        schema = GrievanceSchema(many=True)
-        return schema.dump(grievances)
+        grievances, next_cursor = paginate_grievances(Grievance.query.filter_by(assigned_to=employer_id), limit, cursor, fields)
+        return dump_grievances(grievances, fields), next_cursor
     except Exception as e:
         current_app.logger.error(f"Error fetching assigned grievances for user {employer_id}: {str(e)}")
         raise
@@ -222,8 +302,8 @@ def update_status(id, employer_id, new_status):
         grievance.status = GrievanceStatus[new_status.upper()]
         if grievance.status == GrievanceStatus.RESOLVED:
             grievance.resolved_at = datetime.now(timezone.utc)
-        db.session.commit()
         log_audit(f'Status updated from {old_status} to {grievance.status}', employer_id, id)
+        db.session.commit()
       
         return {"msg": "Status updated"}
     except Exception as e:
@@ -259,6 +339,7 @@ def save_workproof_record(grievance_id, employer_id, file, notes):
             notes=notes,
         )
         db.session.add(workproof)
+        log_audit(f"Workproof uploaded for grievance {grievance_id}", employer_id, grievance_id)
         db.session.commit()
 
         schema = WorkproofSchema()
@@ -292,54 +373,29 @@ def reassign_grievance(id, new_assigned_to, admin_id):
             current_app.logger.error(f"Grievance {id} not found for reassignment")
             raise ValueError("Grievance not found")
         grievance.assigned_to = new_assigned_to
-        db.session.commit()
         log_audit('Grievance reassigned', admin_id, id)
+        db.session.commit()
         return {"msg": "Reassigned"}
     except Exception as e:
         current_app.logger.error(f"Error reassigning grievance {id}: {str(e)}")
         raise
 
-def log_audit(action, user_id, grievance_id=None):
-    try:
-        log = AuditLog(action=action, performed_by=user_id, grievance_id=grievance_id)
-        db.session.add(log)
-        db.session.commit()
-    except Exception as e:
-        current_app.logger.error(f"Error logging audit for action {action}: {str(e)}")
-        raise
-
-def _check_auto_close(grievance):
-    try:
-        if grievance.status == GrievanceStatus.RESOLVED and grievance.resolved_at:
-            sla_days = int(Config.SLA_CLOSURE_DAYS) if hasattr(Config, 'SLA_CLOSURE_DAYS') else 7
-            if datetime.now(timezone.utc) - grievance.resolved_at > timedelta(days=sla_days):
-                grievance.status = GrievanceStatus.CLOSED
-                db.session.commit()
-                log_audit('Auto-closed due to SLA', grievance.assigned_to, grievance.id)
-                
-    except Exception as e:
-        current_app.logger.error(f"Error checking auto-close for grievance {grievance.id}: {str(e)}")
-        raise
-
 def escalate_grievance(grievance_id, escalated_by, new_assignee_id=None):
-    MAX_ESCALATION_LEVEL = 3
-    ESCALATION_FLOW = {
-        0: "Assigned Staff",
-        1: "Member Head",
-        2: "Admin",
-        3: "Super Admin"
-    }
+    """
+    Raise a grievance one escalation level, optionally handing it to a new
+    assignee. The scheduled sweep in escalation_service does the same in bulk.
+    """
+    max_level = get_max_escalation_level()
     try:
         grievance = db.session.get(Grievance, grievance_id)
         if not grievance:
             current_app.logger.error(f"Grievance {grievance_id} not found for escalation")
             raise ValueError("Grievance not found")
 
-        if grievance.escalation_level >= MAX_ESCALATION_LEVEL:
+        level = grievance.escalation_level or 0
+        if level >= max_level:
             current_app.logger.error(f"Grievance {grievance_id} already at maximum escalation level")
-            return {"success": False, "msg": "Already at maximum escalation level"}
-
-        grievance.escalation_level += 1
+            return {"success": False, "msg": f"Cannot escalate beyond level {max_level}"}
 
         if new_assignee_id:
             new_assignee = db.session.get(User, new_assignee_id)
@@ -349,15 +405,17 @@ def escalate_grievance(grievance_id, escalated_by, new_assignee_id=None):
             grievance.assigned_to = new_assignee_id
             grievance.assigned_by = escalated_by
 
+        grievance.escalation_level = level + 1
         grievance.updated_at = datetime.now(timezone.utc)
-        db.session.commit()
-
         log_audit(
             f"Grievance {grievance_id} escalated to level {grievance.escalation_level}",
             escalated_by,
             grievance_id
         )
-        return {"success": True, "msg": f" Escalated to level {grievance.escalation_level}"}
+        db.session.commit()
+
+        return {"success": True, "msg": f"Escalated to level {grievance.escalation_level}"}
     except Exception as e:
+        db.session.rollback()
         current_app.logger.error(f"Error escalating grievance {grievance_id}: {str(e)}")
         raise
\ No newline at end of file
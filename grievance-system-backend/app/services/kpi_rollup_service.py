@@ -0,0 +1,202 @@
+import calendar
+import math
+from datetime import datetime, time, timedelta, timezone
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, case, inspect, select, literal_column
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from ..models import Grievance, GrievanceDailyStats, GrievanceStatus, User
+from ..utils.kpi_utils import PENDING_EXCLUDED, PERIOD_DELTAS, dashboard_summary, grievance_kpi_summary
+from .. import db
+
+_stats = GrievanceDailyStats.__table__
+_BUCKET_COLUMNS = ('day', 'area_id', 'subject_id', 'status', 'assignee_id', 'resolution_days')
+_MEASURE_COLUMNS = ('grievance_count', 'created_epoch_sum', 'resolution_days_sum')
+_SOURCE_COLUMNS = (Grievance.created_at, Grievance.updated_at, Grievance.area_id,
+                   Grievance.subject_id, Grievance.status, Grievance.assigned_to)
+# A change to any of these moves a grievance to another bucket
+_BUCKET_ATTRIBUTES = ('created_at', 'area_id', 'subject_id', 'status', 'assigned_to')
+_PENDING_VALUES = [status.value for status in PENDING_EXCLUDED]
+
+def rollup_enabled():
+    return has_app_context() and current_app.config.get('KPI_ROLLUP_ENABLED', False)
+
+def _naive_utc(value):
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _bucket(created_at, updated_at, area_id, subject_id, status, assigned_to):
+    """Bucket key and measures of one grievance."""
+    created_at = _naive_utc(created_at)
+    updated_at = _naive_utc(updated_at) or created_at
+    status = status.value if isinstance(status, GrievanceStatus) else status
+    resolution = None
+    if status == GrievanceStatus.CLOSED.value:
+        resolution = max((updated_at - created_at).total_seconds() / 86400, 0.0)
+    # ceil(days) <= N exactly when days <= N, so SLA checks stay exact per bucket
+    key = (created_at.date(), area_id, subject_id, status, assigned_to or 0,
+           math.ceil(resolution) if resolution is not None else -1)
+    epoch = calendar.timegm(created_at.timetuple()) + created_at.microsecond / 1e6
+    return key, (1, epoch, resolution or 0.0)
+
+def _aggregate(rows, buckets=None):
+    buckets = {} if buckets is None else buckets
+    for row in rows:
+        key, measures = _bucket(*row)
+        current = buckets.get(key)
+        buckets[key] = measures if current is None else tuple(a + b for a, b in zip(current, measures))
+    return buckets
+
+def _bucket_values(buckets):
+    return [dict(zip(_BUCKET_COLUMNS + _MEASURE_COLUMNS, key + measures)) for key, measures in buckets.items()]
+
+def _insert_buckets(connection, buckets, batch_size=1000):
+    values = _bucket_values(buckets)
+    for start in range(0, len(values), batch_size):
+        connection.execute(_stats.insert(), values[start:start + batch_size])
+
+def _upsert_buckets(connection, buckets):
+    """Add the measures of `buckets` onto existing rollup rows."""
+    dialect = {'sqlite': sqlite, 'postgresql': postgresql}.get(connection.dialect.name)
+    for values in _bucket_values(buckets):
+        if dialect is not None:
+            stmt = dialect.insert(_stats).values(**values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(_BUCKET_COLUMNS),
+                set_={name: _stats.c[name] + stmt.excluded[name] for name in _MEASURE_COLUMNS}
+            )
+            connection.execute(stmt)
+            continue
+        match = [_stats.c[name] == values[name] for name in _BUCKET_COLUMNS]
+        updated = connection.execute(
+            _stats.update().where(*match).values({name: _stats.c[name] + values[name] for name in _MEASURE_COLUMNS})
+        ).rowcount
+        if not updated:
+            connection.execute(_stats.insert().values(**values))
+
+def refresh_daily_stats(days, connection=None):
+    """Recompute the rollup rows of the given days from the grievance table."""
+    connection = connection or db.session.connection()
+    for day in sorted(set(days)):
+        start = datetime.combine(day, time.min)
+        rows = connection.execute(
+            select(*_SOURCE_COLUMNS).where(Grievance.created_at >= start, Grievance.created_at < start + timedelta(days=1))
+        )
+        buckets = _aggregate(rows)
+        connection.execute(_stats.delete().where(_stats.c.day == day))
+        _insert_buckets(connection, buckets)
+
+def rebuild_daily_stats(batch_size=5000):
+    """
+    Backfill: replace the whole rollup from a streamed scan of the grievance
+    table and commit. Returns the number of rollup rows written.
+    """
+    connection = db.session.connection()
+    rows = connection.execution_options(yield_per=batch_size).execute(select(*_SOURCE_COLUMNS))
+    buckets = _aggregate(rows)
+    connection.execute(_stats.delete())
+    _insert_buckets(connection, buckets)
+    db.session.commit()
+    return len(buckets)
+
+def _day_of(value):
+    value = _naive_utc(value)
+    return value.date() if value is not None else None
+
+def _moves_bucket(session, grievance):
+    state = inspect(grievance)
+    if any(state.attrs[name].history.has_changes() for name in _BUCKET_ATTRIBUTES):
+        return True
+    # updated_at moves with any edit and is part of a closed grievance's resolution time
+    return grievance.status == GrievanceStatus.CLOSED and session.is_modified(grievance)
+
+# Days whose rows are touched by updates or deletes are recomputed after the
+# flush, in the same transaction; new grievances are added to their bucket.
+@event.listens_for(Session, 'before_flush')
+def _collect_rollup_days(session, flush_context, instances):
+    if not rollup_enabled():
+        return
+    days = session.info.setdefault('rollup_days', set())
+    for obj in session.deleted:
+        if isinstance(obj, Grievance):
+            days.add(_day_of(obj.created_at))
+    for obj in session.dirty:
+        if isinstance(obj, Grievance) and _moves_bucket(session, obj):
+            history = inspect(obj).attrs.created_at.history
+            days.update(_day_of(value) for value in (obj.created_at, *history.deleted))
+    days.discard(None)
+
+@event.listens_for(Session, 'after_flush')
+def _apply_rollup(session, flush_context):
+    if not rollup_enabled():
+        return
+    days = session.info.pop('rollup_days', set())
+    new_rows = [
+        tuple(getattr(obj, column.key) for column in _SOURCE_COLUMNS)
+        for obj in session.new if isinstance(obj, Grievance)
+    ]
+    # the recomputed days already include their new grievances
+    buckets = _aggregate(row for row in new_rows if _day_of(row[0]) not in days)
+    if not days and not buckets:
+        return
+    connection = session.connection()
+    if buckets:
+        _upsert_buckets(connection, buckets)
+    if days:
+        refresh_daily_stats(days, connection)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rollup_days(session):
+    session.info.pop('rollup_days', None)
+
+def _sum_if(condition, value):
+    return func.sum(case((condition, value), else_=0))
+
+def calculate_rollup_dashboard_kpis(sla_days=30):
+    """calculate_dashboard_kpis served from grievance_daily_stats."""
+    closed = _stats.c.status == GrievanceStatus.CLOSED.value
+    pending = _stats.c.status.notin_(_PENDING_VALUES)
+    count = _stats.c.grievance_count
+    total, total_closed, pending_count, epoch_sum, compliant = db.session.execute(select(
+        func.sum(count),
+        _sum_if(closed, count),
+        _sum_if(pending, count),
+        _sum_if(pending, _stats.c.created_epoch_sum),
+        _sum_if(closed & (_stats.c.resolution_days <= sla_days), count),
+    )).one()
+    aging = None
+    if pending_count:
+        now = datetime.now(timezone.utc).timestamp()
+        aging = (now * pending_count - epoch_sum) / pending_count / 86400
+    return dashboard_summary(total, total_closed, pending_count, aging, compliant)
+
+def calculate_rollup_grievance_kpis(time_period='all', sla_days=7, area_names=None):
+    """
+    calculate_grievance_kpis served from grievance_daily_stats. Periods are
+    matched on whole days: 'day' counts today and yesterday's grievances.
+    """
+    today = datetime.now(timezone.utc).date()
+    closed = _stats.c.status == GrievanceStatus.CLOSED.value
+    count = _stats.c.grievance_count
+
+    period_start = today - PERIOD_DELTAS[time_period] if time_period in PERIOD_DELTAS else None
+    group_columns = [_stats.c.status, _stats.c.area_id, _stats.c.assignee_id, User.name]
+    group_by = list(group_columns)
+    if period_start is not None:
+        group_columns.append(case((_stats.c.day >= period_start, 1), else_=0).label('in_period'))
+        group_by.append(literal_column('in_period'))
+
+    rows = db.session.execute(
+        select(
+            *group_columns,
+            func.sum(count),
+            *[_sum_if(_stats.c.day >= today - delta, count) for delta in PERIOD_DELTAS.values()],
+            _sum_if(closed & (_stats.c.resolution_days <= sla_days), count),
+            _sum_if(closed, _stats.c.resolution_days_sum),
+        )
+        .outerjoin(User, User.id == _stats.c.assignee_id)
+        .group_by(*group_by)
+    ).all()
+    rows = [(GrievanceStatus(row[0]), row[1], row[2] or None, *row[3:]) for row in rows]
+    return grievance_kpi_summary(rows, period_start is not None, sla_days, area_names)
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import threading
+import time
+from flask import current_app
+from sqlalchemy import event
+from sqlalchemy.orm import Session, joinedload
+from ..models import MasterSubjects, MasterAreas, MasterCategories, MasterConfig
+from .. import db
+
+MASTER_TABLES = {
+    'subjects': MasterSubjects,
+    'areas': MasterAreas,
+    'categories': MasterCategories,
+    'configs': MasterConfig,
+}
+_TABLE_NAMES = {model.__table__.name: name for name, model in MASTER_TABLES.items()}
+
+# name -> (expires_at, version, rows)
+_cache = {}
+_cache_lock = threading.Lock()
+
+def _row_dict(obj):
+    return {column.key: getattr(obj, column.key) for column in obj.__table__.columns}
+
+def _load_rows(name):
+    model = MASTER_TABLES[name]
+    if name == 'subjects':
+        subjects = MasterSubjects.query.options(joinedload(MasterSubjects.category)).order_by(MasterSubjects.id).all()
+        rows = []
+        for s in subjects:
+            row = _row_dict(s)
+            row['category'] = _row_dict(s.category) if s.category else None
+            rows.append(row)
+        return rows
+    return [_row_dict(obj) for obj in model.query.order_by(model.id).all()]
+
+def _fingerprint(rows):
+    payload = json.dumps(rows, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha1(payload).hexdigest()[:16]
+
+def _get_entry(name):
+    if name not in MASTER_TABLES:
+        raise ValueError(f"Unknown master table. Must be one of {list(MASTER_TABLES)}")
+    now = time.monotonic()
+    entry = _cache.get(name)
+    if entry and entry[0] > now:
+        return entry
+    rows = _load_rows(name)
+    ttl = current_app.config.get('MASTER_DATA_CACHE_TTL', 300)
+    entry = (now + ttl, _fingerprint(rows), rows)
+    if ttl > 0:
+        with _cache_lock:
+            _cache[name] = entry
+    return entry
+
+def get_master_data(name):
+    """
+    Cached rows of a master table as dicts of column values. Subjects also
+    carry their category under 'category'. Treat the result as read-only.
+    """
+    return _get_entry(name)[2]
+
+def get_master_version(name):
+    """Content fingerprint of a master table; changes whenever its rows change."""
+    return _get_entry(name)[1]
+
+def get_master_versions():
+    return {name: get_master_version(name) for name in MASTER_TABLES}
+
+def get_config_value(key, default=None):
+    for config in get_master_data('configs'):
+        if config['key'] == key:
+            return config['value']
+    return default
+
+def invalidate_master_data(*names):
+    with _cache_lock:
+        for name in names or list(MASTER_TABLES):
+            _cache.pop(name, None)
+
+# Writes are collected per session at flush and the cache is dropped only after
+# the commit, so a concurrent reader can't re-cache the pre-commit rows.
+@event.listens_for(Session, 'after_flush')
+def _collect_master_changes(session, flush_context):
+    changed = session.info.setdefault('master_data_changed', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        name = _TABLE_NAMES.get(getattr(getattr(obj, '__table__', None), 'name', None))
+        if name:
+            changed.add(name)
+            if name == 'categories':
+                changed.add('subjects')
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_master_changes(session):
+    changed = session.info.pop('master_data_changed', None)
+    if changed:
+        invalidate_master_data(*changed)
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_master_changes(session):
+    session.info.pop('master_data_changed', None)
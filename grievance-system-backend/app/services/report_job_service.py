@@ -0,0 +1,155 @@
+import json
+import os
+import re
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import time
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from .report_service import validate_report_args, generate_report, stream_report_csv
+from .. import db
+
+REPORT_EXTENSIONS = {'csv': 'csv', 'excel': 'xlsx', 'pdf': 'pdf', 'parquet': 'parquet', 'arrow': 'arrow'}
+REPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'excel': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'pdf': 'application/pdf',
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.file',
+}
+_JOB_ID = re.compile(r'^[0-9a-f]{32}$')
+
+_executor = None
+_executor_lock = threading.Lock()
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=current_app.config.get('REPORT_JOB_WORKERS', 2),
+                thread_name_prefix='report-job'
+            )
+        return _executor
+
+def reports_dir():
+    path = os.path.join(current_app.config['UPLOAD_FOLDER'], 'reports')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def _job_path(directory, job_id):
+    return os.path.join(directory, f"{job_id}.json")
+
+def _save_job(directory, job):
+    # written whole and swapped in, so a poll never reads a half-written file
+    path = _job_path(directory, job['id'])
+    with open(path + '.tmp', 'w') as f:
+        json.dump(job, f)
+    os.replace(path + '.tmp', path)
+
+def _now():
+    return datetime.now(timezone.utc).isoformat()
+
+def get_report_job(job_id):
+    """The job's state, or None if there is no such job."""
+    if not _JOB_ID.match(job_id or ''):
+        return None
+    try:
+        with open(_job_path(reports_dir(), job_id)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def report_job_file(job):
+    """Path of a completed job's output."""
+    return os.path.join(reports_dir(), job['file_name'])
+
+def submit_report_job(filter_type='all', format='pdf', user_id=None, area_id=None, requested_by=None):
+    """
+    Queue a report on the in-process worker pool and return its job record.
+    Job state lives in UPLOAD_FOLDER/reports next to the output, so any worker
+    process sharing that folder can answer status polls.
+    """
+    validate_report_args(filter_type, format)
+    job_id = uuid.uuid4().hex
+    job = {
+        'id': job_id,
+        'status': 'queued',
+        'progress': 0,
+        'filter_type': filter_type,
+        'format': format,
+        'user_id': user_id,
+        'area_id': area_id,
+        'requested_by': requested_by,
+        'file_name': f"{job_id}.{REPORT_EXTENSIONS[format]}",
+        'error': None,
+        'created_at': _now(),
+        'started_at': None,
+        'finished_at': None,
+    }
+    _save_job(reports_dir(), job)
+    _get_executor().submit(_run_report_job, current_app._get_current_object(), job)
+    return job
+
+def _run_report_job(app, job):
+    with app.app_context():
+        directory = reports_dir()
+        job.update(status='running', progress=10, started_at=_now())
+        _save_job(directory, job)
+        path = os.path.join(directory, job['file_name'])
+        args = (job['filter_type'], job['user_id'], job['area_id'])
+        try:
+            if job['format'] == 'csv':
+                with open(path, 'w', newline='', encoding='utf-8') as f:
+                    for chunk in stream_report_csv(*args):
+                        f.write(chunk)
+            else:
+                generate_report(job['filter_type'], job['format'], job['user_id'], job['area_id'], output_path=path)
+            job.update(status='completed', progress=100)
+        except Exception as e:
+            current_app.logger.exception("Report job %s failed", job['id'])
+            if os.path.exists(path):
+                os.remove(path)
+            job.update(status='failed', error=str(e))
+        finally:
+            db.session.remove()
+            job['finished_at'] = _now()
+            _save_job(directory, job)
+
+def purge_report_jobs():
+    """
+    Delete finished jobs and their output once they are REPORT_JOB_TTL_HOURS
+    old, plus any stray file in the reports folder older than that.
+    Returns the number of jobs removed.
+    """
+    directory = reports_dir()
+    ttl = timedelta(hours=current_app.config.get('REPORT_JOB_TTL_HOURS', 24))
+    cutoff = datetime.now(timezone.utc) - ttl
+    removed = 0
+    for name in os.listdir(directory):
+        if not name.endswith('.json') or not _JOB_ID.match(name[:-5]):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                job = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if job.get('status') not in ('completed', 'failed') or not job.get('finished_at'):
+            continue
+        if datetime.fromisoformat(job['finished_at']) > cutoff:
+            continue
+        for path in (os.path.join(directory, job['file_name']), os.path.join(directory, name)):
+            if os.path.exists(path):
+                os.remove(path)
+        removed += 1
+
+    # outputs and .tmp files left behind by a worker that died mid-job
+    stale_before = time.time() - ttl.total_seconds()
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path) and os.path.getmtime(path) < stale_before:
+            os.remove(path)
+    if removed:
+        current_app.logger.info("Purged %d report jobs older than %s", removed, ttl)
+    return removed
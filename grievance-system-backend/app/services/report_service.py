@@ -1,60 +1,225 @@
+import csv
+import os
+import tempfile
 import pandas as pd
+from enum import Enum
 from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from io import BytesIO
+from io import BytesIO, StringIO
 from sqlalchemy import func, and_
 from datetime import datetime, timedelta, timezone
 from flask import current_app
 from sqlalchemy import func, case
 from ..models import Grievance, GrievanceStatus, User, MasterAreas, AuditLog, Role
 from .. import db
+from .grievance_service import load_grievance_list
+from .master_data_service import get_master_data
+from .audit_service import log_audit
+from .sla_service import get_sla_closure_days
+from ..utils.db_routing import read_from_replica, replica_reads
+from ..utils.kpi_utils import calculate_grievance_kpis, calculate_dashboard_kpis, days_between
+from .kpi_rollup_service import rollup_enabled, calculate_rollup_grievance_kpis, calculate_rollup_dashboard_kpis
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # optional: only needed for the parquet/arrow formats
+    pa = pq = None
 
-def generate_report(filter_type='all', format='pdf', user_id=None, area_id=None):
-    valid_filters = ['all', 'day', 'week', 'month', 'year']
-    valid_formats = ['csv', 'excel', 'pdf']
-    if filter_type not in valid_filters:
-        raise ValueError(f"Invalid filter_type. Must be one of {valid_filters}")
-    if format not in valid_formats:
-        raise ValueError(f"Invalid format. Must be one of {valid_formats}")
+
+REPORT_FILTERS = ['all', 'day', 'week', 'month', 'year']
+REPORT_FORMATS = ['csv', 'excel', 'pdf', 'parquet', 'arrow']
+COLUMNAR_FORMATS = ['parquet', 'arrow']
+REPORT_FILTER_DELTAS = {
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+    'month': timedelta(days=30),
+    'year': timedelta(days=365),
+}
+
+def validate_report_args(filter_type, format):
+    if filter_type not in REPORT_FILTERS:
+        raise ValueError(f"Invalid filter_type. Must be one of {REPORT_FILTERS}")
+    if format not in REPORT_FORMATS:
+        raise ValueError(f"Invalid format. Must be one of {REPORT_FORMATS}")
+    if format in COLUMNAR_FORMATS and pa is None:
+        raise ValueError(f"The {format} format requires pyarrow to be installed")
+
+def build_report_query(filter_type='all', user_id=None, area_id=None):
     query = Grievance.query
-    now = datetime.now(timezone.utc)
-    if filter_type == 'day':
-        query = query.filter(Grievance.created_at >= now - timedelta(days=1))
-    elif filter_type == 'week':
-        query = query.filter(Grievance.created_at >= now - timedelta(weeks=1))
-    elif filter_type == 'month':
-        query = query.filter(Grievance.created_at >= now - timedelta(days=30))
-    elif filter_type == 'year':
-        query = query.filter(Grievance.created_at >= now - timedelta(days=365))
+    if filter_type in REPORT_FILTER_DELTAS:
+        query = query.filter(Grievance.created_at >= datetime.now(timezone.utc) - REPORT_FILTER_DELTAS[filter_type])
     if user_id:
         query = query.filter(Grievance.citizen_id == user_id)
     if area_id:
         query = query.filter(Grievance.area_id == area_id)
+    return query
+
+def _csv_value(value):
+    if isinstance(value, Enum):
+        return value.value
+    return '' if value is None else value
+
+def stream_report_csv(filter_type='all', user_id=None, area_id=None, batch_size=1000):
+    """
+    Yield the grievance report as CSV text chunks, one per `batch_size` rows,
+    reading the table through a streaming cursor so memory stays flat.
+    """
+    columns = list(Grievance.__table__.columns)
+    query = build_report_query(filter_type, user_id, area_id).with_entities(*columns)
+    output = StringIO()
+    writer = csv.writer(output)
+    writer.writerow([column.key for column in columns])
+    # a generator body runs after the caller returns, so it opts into the replica itself
+    with replica_reads():
+        for index, row in enumerate(query.yield_per(batch_size), 1):
+            writer.writerow([_csv_value(value) for value in row])
+            if index % batch_size == 0:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate(0)
+    yield output.getvalue()
+
+def _arrow_type(column):
+    python_type = column.type.python_type
+    if issubclass(python_type, Enum) or python_type is str:
+        return pa.string()
+    if python_type is bool:
+        return pa.bool_()
+    if python_type is int:
+        return pa.int64()
+    if python_type is float:
+        return pa.float64()
+    if python_type is datetime:
+        return pa.timestamp('us')
+    return pa.string()
+
+@read_from_replica
+def write_columnar_report(output_path, filter_type='all', format='parquet', user_id=None, area_id=None, batch_size=10000):
+    """
+    Write the grievance report as Parquet (one row group per `batch_size` rows)
+    or an Arrow IPC file, converting batches straight from a streaming cursor.
+    """
+    columns = list(Grievance.__table__.columns)
+    schema = pa.schema([pa.field(column.key, _arrow_type(column)) for column in columns])
+    query = build_report_query(filter_type, user_id, area_id).with_entities(*columns)
+    if format == 'parquet':
+        writer = pq.ParquetWriter(output_path, schema, compression='zstd')
+    else:
+        writer = pa.ipc.new_file(output_path, schema)
     try:
-        data = pd.read_sql(query.statement, db.engine)
+        result = db.session.execute(query.statement, execution_options={'yield_per': batch_size})
+        for rows in result.partitions():
+            arrays = [
+                pa.array([value.value if isinstance(value, Enum) else value for value in values], type=field.type)
+                for values, field in zip(zip(*rows), schema)
+            ]
+            writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+    finally:
+        writer.close()
+    return output_path
+
+def pdf_report_columns():
+    configured = current_app.config.get('REPORT_PDF_COLUMNS') or []
+    return [name for name in configured if name in Grievance.__table__.columns]
+
+@read_from_replica
+def generate_report(filter_type='all', format='pdf', user_id=None, area_id=None, output_path=None):
+    """
+    Build a grievance report. Returns the file content, or writes it to
+    `output_path` and returns that path when one is given.
+    """
+    validate_report_args(filter_type, format)
+    if format in COLUMNAR_FORMATS:
+        if output_path:
+            return write_columnar_report(output_path, filter_type, format, user_id, area_id)
+        handle, path = tempfile.mkstemp(suffix=f".{format}")
+        os.close(handle)
+        try:
+            write_columnar_report(path, filter_type, format, user_id, area_id)
+            with open(path, 'rb') as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+    query = build_report_query(filter_type, user_id, area_id)
+    statement = query.statement
+    if format == 'pdf':
+        statement = query.with_entities(*[Grievance.__table__.c[name] for name in pdf_report_columns()]).statement
+    try:
+        # through the session, so replica routing applies
+        result = db.session.execute(statement)
+        data = pd.DataFrame(result.all(), columns=list(result.keys()))
     except Exception as e:
         raise Exception(f"Failed to fetch grievance data: {str(e)}")
     if format == 'csv':
-        return data.to_csv(index=False).encode('utf-8')
+        content = data.to_csv(index=False).encode('utf-8')
     elif format == 'excel':
-        output = BytesIO()
+        output = output_path or BytesIO()
         with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
             data.to_excel(writer, index=False, sheet_name='Grievance Report')
-            summary_data = get_summary_statistics(query)
+            summary_data = report_summary(data, query)
             summary_df = pd.DataFrame(list(summary_data.items()), columns=['Metric', 'Value'])
             summary_df.to_excel(writer, index=False, sheet_name='Summary')
-        return output.getvalue()
+        if output_path:
+            return output_path
+        content = output.getvalue()
     elif format == 'pdf':
-        return generate_pdf_report(data, filter_type, user_id, area_id)
-    
-    return None
+        return generate_pdf_report(data, filter_type, user_id, area_id, output_path, report_summary(data, query))
+
+    if output_path:
+        with open(output_path, 'wb') as f:
+            f.write(content)
+        return output_path
+    return content
 
-def generate_pdf_report(data, filter_type, user_id, area_id):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
+PDF_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+def _pdf_cell(value, max_length=40):
+    if isinstance(value, Enum):
+        return value.value
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ''
+    if isinstance(value, (datetime, pd.Timestamp)):
+        return value.strftime('%Y-%m-%d %H:%M')
+    text = str(value)
+    return text if len(text) <= max_length else text[:max_length - 3] + '...'
+
+def _pdf_tables(data, rows_per_table):
+    """One small table per chunk of rows, each starting with the header row."""
+    header = list(data.columns)
+    chunk = []
+    for row in data.itertuples(index=False, name=None):
+        chunk.append([_pdf_cell(value) for value in row])
+        if len(chunk) == rows_per_table:
+            yield Table([header] + chunk, style=PDF_TABLE_STYLE, repeatRows=1)
+            chunk = []
+    if chunk:
+        yield Table([header] + chunk, style=PDF_TABLE_STYLE, repeatRows=1)
+
+def generate_pdf_report(data, filter_type, user_id, area_id, output_path=None, summary_data=None):
+    """
+    Render `data` as a PDF built into a file rather than memory. Rows are laid
+    out REPORT_PDF_ROWS_PER_TABLE at a time so reportlab never has to split one
+    huge table. Returns the PDF bytes, or `output_path` when one is given.
+    """
+    path = output_path
+    if path is None:
+        handle, path = tempfile.mkstemp(suffix='.pdf')
+        os.close(handle)
+    doc = SimpleDocTemplate(path, pagesize=letter)
     elements = []
     styles = getSampleStyleSheet()
     title_style = ParagraphStyle(
@@ -81,208 +246,96 @@ def generate_pdf_report(data, filter_type, user_id, area_id):
         spaceAfter=12
     )
     
-    query = Grievance.query
-    if filter_type != 'all':
-        now = datetime.now(timezone.utc)
-        if filter_type == 'day':
-            query = query.filter(Grievance.created_at >= now - timedelta(days=1))
-        elif filter_type == 'week':
-            query = query.filter(Grievance.created_at >= now - timedelta(weeks=1))
-        elif filter_type == 'month':
-            query = query.filter(Grievance.created_at >= now - timedelta(days=30))
-        elif filter_type == 'year':
-            query = query.filter(Grievance.created_at >= now - timedelta(days=365))
-    
-    if user_id:
-        query = query.filter(Grievance.citizen_id == user_id)
-    if area_id:
-        query = query.filter(Grievance.area_id == area_id)
-    
     try:
-        summary_data = get_summary_statistics(query)
+        if summary_data is None:
+            summary_data = report_summary(data, build_report_query(filter_type, user_id, area_id))
         summary_text = (
             f"Total Grievances: {summary_data.get('total_grievances', 0)} | "
             f"Resolved: {summary_data.get('resolved_count', 0)} | "
             f"Pending: {summary_data.get('pending_count', 0)}"
         )
         elements.append(Paragraph(summary_text, summary_style))
+        breakdown_text = " | ".join(
+            f"{status.value.replace('_', ' ').title()}: {summary_data.get(f'{status.value}_count', 0)}"
+            for status in GrievanceStatus
+        )
+        elements.append(Paragraph(breakdown_text, summary_style))
         elements.append(Spacer(1, 12))
     except Exception as e:
         elements.append(Paragraph(f"Error fetching summary: {str(e)}", summary_style))
         elements.append(Spacer(1, 12))
     if not data.empty:
-        table_data = [list(data.columns)]
-        for _, row in data.iterrows():
-            table_data.append([str(val) for val in row]) 
-        table = Table(table_data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('FONTSIZE', (0, 1), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        elements.append(table)
+        columns = [name for name in pdf_report_columns() if name in data.columns] or list(data.columns)
+        elements.extend(_pdf_tables(data[columns], current_app.config.get('REPORT_PDF_ROWS_PER_TABLE', 40)))
     try:
         doc.build(elements)
-        pdf_content = buffer.getvalue()
     except Exception as e:
-        buffer.close()
+        if os.path.exists(path):
+            os.remove(path)
         raise Exception(f"Failed to generate PDF: {str(e)}")
-    
-    buffer.close()
-    return pdf_content
+
+    if output_path:
+        return output_path
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+def summarize_statuses(status_counts):
+    """Summary statistics from a {GrievanceStatus: count} mapping."""
+    summary = {
+        'total_grievances': sum(status_counts.values()),
+        'resolved_count': status_counts.get(GrievanceStatus.CLOSED, 0),
+        'pending_count': sum(count for status, count in status_counts.items()
+                             if status not in (GrievanceStatus.CLOSED, GrievanceStatus.REJECTED)),
+    }
+    for status in GrievanceStatus:
+        summary[f"{status.value}_count"] = status_counts.get(status, 0)
+    return summary
 
 def get_summary_statistics(query):
     try:
-        total_grievances = query.count()
-        resolved_count = query.filter(Grievance.status == GrievanceStatus.CLOSED).count()
-        pending_count = query.filter(Grievance.status.notin_([
-            GrievanceStatus.CLOSED, 
-            GrievanceStatus.REJECTED
-        ])).count()
-        
-        return {
-            'total_grievances': total_grievances or 0,
-            'resolved_count': resolved_count or 0,
-            'pending_count': pending_count or 0
-        }
+        rows = query.with_entities(Grievance.status, func.count(Grievance.id)).group_by(Grievance.status).all()
+        return summarize_statuses(dict(rows))
     except Exception as e:
         raise Exception(f"Failed to compute summary statistics: {str(e)}")
 
+def report_summary(data, query):
+    """Summary of an already fetched report, falling back to one grouped query."""
+    if 'status' in data.columns:
+        return summarize_statuses(data['status'].value_counts().to_dict())
+    return get_summary_statistics(query)
+
+@read_from_replica
 def get_advanced_kpis(time_period='all'):
     valid_periods = ['day', 'week', 'month', 'year', 'all']
     if time_period not in valid_periods:
         raise ValueError(f"Invalid time_period. Must be one of {valid_periods}")
 
     try:
-        # Calculate time filter
-        now = datetime.now(timezone.utc)
-        if time_period == 'day':
-            time_filter = Grievance.created_at >= now - timedelta(days=1)
-        elif time_period == 'week':
-            time_filter = Grievance.created_at >= now - timedelta(weeks=1)
-        elif time_period == 'month':
-            time_filter = Grievance.created_at >= now - timedelta(days=30)
-        elif time_period == 'year':
-            time_filter = Grievance.created_at >= now - timedelta(days=365)
-        else:
-            time_filter = True 
-        total_complaints = {
-            'day': db.session.query(func.count(Grievance.id))
-                    .filter(Grievance.created_at >= now - timedelta(days=1))
-                    .scalar() or 0,
-            'week': db.session.query(func.count(Grievance.id))
-                    .filter(Grievance.created_at >= now - timedelta(weeks=1))
-                    .scalar() or 0,
-            'month': db.session.query(func.count(Grievance.id))
-                    .filter(Grievance.created_at >= now - timedelta(days=30))
-                    .scalar() or 0,
-            'year': db.session.query(func.count(Grievance.id))
-                    .filter(Grievance.created_at >= now - timedelta(days=365))
-                    .scalar() or 0,
-            'all': db.session.query(func.count(Grievance.id))
-                    .scalar() or 0
-        }
-        status_counts = db.session.query(
-            Grievance.status, 
-            func.count(Grievance.id)
-        ).filter(time_filter).group_by(Grievance.status).all()
-        status_overview = {status.value: count for status, count in status_counts}
-        for status in GrievanceStatus:
-            if status.value not in status_overview:
-                status_overview[status.value] = 0
-        dept_wise = dict(db.session.query(
-            MasterAreas.name, 
-            func.count(Grievance.id)
-        ).join(Grievance, MasterAreas.id == Grievance.area_id)
-        .filter(time_filter)
-        .group_by(MasterAreas.id, MasterAreas.name).all())
-        resolved_grievances = Grievance.query.filter(
-            and_(Grievance.status == GrievanceStatus.CLOSED, time_filter)
-        )
-        
-        sla_days = current_app.config.get('SLA_CLOSURE_DAYS', 7)
-        sla_compliant = resolved_grievances.filter(
-            Grievance.updated_at - Grievance.created_at <= timedelta(days=sla_days)
-        ).count()
-        
-        total_resolved = resolved_grievances.count()
-        sla_compliance_rate = (sla_compliant / total_resolved * 100) if total_resolved > 0 else 0
-        staff_performance = dict(db.session.query(
-            User.name, 
-            func.count(Grievance.id)
-        ).join(Grievance, User.id == Grievance.assigned_to)
-        .filter(and_(Grievance.status == GrievanceStatus.CLOSED, time_filter))
-        .group_by(User.id, User.name).all())
-        avg_resolution_time = db.session.query(
-            func.avg(func.julianday(Grievance.updated_at) - func.julianday(Grievance.created_at))
-        ).filter(and_(Grievance.status == GrievanceStatus.CLOSED, time_filter)).scalar() or 0
-        
-        return {
-            'total_complaints': total_complaints,
-            'status_overview': status_overview,
-            'dept_wise': dept_wise or {},
-            'sla_metrics': {
-                'sla_days': sla_days,
-                'sla_compliant': sla_compliant or 0,
-                'total_resolved': total_resolved or 0,
-                'sla_compliance_rate': round(sla_compliance_rate, 2),
-                'avg_resolution_time_days': round(avg_resolution_time, 2)
-            },
-            'staff_performance': staff_performance or {}
-        }
+        sla_days = get_sla_closure_days()
+        area_names = {area['id']: area['name'] for area in get_master_data('areas')}
+        if rollup_enabled():
+            return calculate_rollup_grievance_kpis(time_period, sla_days, area_names)
+        return calculate_grievance_kpis(time_period, sla_days, area_names)
     except Exception as e:
         raise Exception(f"Failed to compute KPIs: {str(e)}")
 
+@read_from_replica
+def get_dashboard_kpis():
+    if rollup_enabled():
+        return calculate_rollup_dashboard_kpis()
+    return calculate_dashboard_kpis()
+
+@read_from_replica
 def get_citizen_history(user_id):
     try:
-        return Grievance.query.filter_by(citizen_id=user_id).all()
+        return load_grievance_list(Grievance.query.filter_by(citizen_id=user_id))
     except Exception as e:
         raise Exception(f"Failed to fetch citizen history: {str(e)}")
 
-def escalate_grievance(grievance_id, escalated_by, new_assignee_id=None):
-    try:
-        grievance = Grievance.query.get(grievance_id)
-        if not grievance:
-            return {"success": False, "message": "Grievance not found"}
-        
-        max_escalation_level = int(current_app.config.get('MAX_ESCALATION_LEVEL', 3))
-        if grievance.escalation_level >= max_escalation_level:
-            return {"success": False, "message": f"Cannot escalate beyond level {max_escalation_level}"}
-        grievance.escalation_level = (grievance.escalation_level or 0) + 1
-        grievance.status = GrievanceStatus.ON_HOLD
-        if new_assignee_id:
-            assignee = User.query.get(new_assignee_id)
-            if not assignee:
-                return {"success": False, "message": "Assignee not found"}
-            grievance.assigned_to = new_assignee_id
-            grievance.assigned_by = escalated_by
-        grievance.updated_at = datetime.now(timezone.utc)
-        log_audit(f'Grievance escalated to level {grievance.escalation_level}', escalated_by, grievance_id)
-        
-        db.session.commit()
-        
-
-        
-        return {"success": True, "message": f"Grievance escalated to level {grievance.escalation_level}"}
-    except Exception as e:
-        db.session.rollback()
-        raise Exception(f"Failed to escalate grievance: {str(e)}")
-
-def log_audit(action, user_id, grievance_id=None):
-    try:
-        log = AuditLog(action=action, performed_by=user_id, grievance_id=grievance_id)
-        db.session.add(log)
-        db.session.commit()
-    except Exception as e:
-        db.session.rollback()
-        raise Exception(f"Failed to log audit: {str(e)}")
-
+@read_from_replica
 def get_staff_performance():
     query = (
         db.session.query(
@@ -291,11 +344,11 @@ def get_staff_performance():
             func.count(Grievance.id).label("total_assigned"),
             func.sum(case((Grievance.status == GrievanceStatus.CLOSED, 1), else_=0)).label("resolved_count"),
             func.avg(case((Grievance.status == GrievanceStatus.CLOSED,
-                           func.strftime('%s', Grievance.resolved_at) - func.strftime('%s', Grievance.created_at)))).label("avg_resolution_time_seconds"),
+                           days_between(Grievance.created_at, Grievance.resolved_at)))).label("avg_resolution_time_days"),
             func.avg(Grievance.feedback_rating).label("avg_feedback_rating")
         )
         .join(User, User.id == Grievance.assigned_to)
-        .filter(User.role == Role.EMPLOYER)
+        .filter(User.role == Role.FIELD_STAFF)
         .group_by(User.id, User.name)
     ).all()
 
@@ -306,11 +359,12 @@ def get_staff_performance():
             "staff_name": row.staff_name,
             "total_assigned": int(row.total_assigned or 0),
             "resolved_count": int(row.resolved_count or 0),
-            "avg_resolution_time_hours": round((row.avg_resolution_time_seconds or 0) / 3600, 2),
+            "avg_resolution_time_hours": round((row.avg_resolution_time_days or 0) * 24, 2),
             "avg_feedback_rating": round(row.avg_feedback_rating or 0, 2)
         })
     return results
 
+@read_from_replica
 def get_location_reports():
     ward_data = (
         db.session.query(
@@ -0,0 +1,191 @@
+import re
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, text, bindparam
+from sqlalchemy.orm import Session
+from ..models import Grievance, GrievanceComment, GrievanceStatus
+from ..utils.pagination import encode_cursor, decode_cursor
+from .. import db
+
+# One row per grievance: title, description, address and all comment text.
+# SQLite keeps it in an FTS5 table keyed by rowid = grievance id; Postgres in a
+# weighted tsvector column with a GIN index. Not a model, so autogenerate skips it.
+SEARCH_TABLE = 'grievance_search'
+SEARCH_DIALECTS = ('sqlite', 'postgresql')
+MAX_QUERY_TERMS = 10
+# Devanagari vowel signs are not \w, so the block is matched explicitly
+_TERM = re.compile(r'[\w\u0900-\u097F]+')
+_TEXT_ATTRIBUTES = ('title', 'description', 'address')
+
+_CREATE = {
+    'sqlite': [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+        "title, description, address, comments, tokenize = 'unicode61 remove_diacritics 2')",
+    ],
+    'postgresql': [
+        f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+        "grievance_id INTEGER PRIMARY KEY REFERENCES grievance (id) ON DELETE CASCADE, "
+        "document TSVECTOR NOT NULL)",
+        f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_document ON {SEARCH_TABLE} USING GIN (document)",
+    ],
+}
+
+_DELETE = {
+    'sqlite': f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN :ids",
+    'postgresql': f"DELETE FROM {SEARCH_TABLE} WHERE grievance_id IN :ids",
+}
+
+_INSERT = {
+    'sqlite': (
+        f"INSERT INTO {SEARCH_TABLE} (rowid, title, description, address, comments) "
+        "SELECT g.id, g.title, g.description, coalesce(g.address, ''), "
+        "coalesce((SELECT group_concat(c.comment_text, ' ') FROM grievance_comment c WHERE c.grievance_id = g.id), '') "
+        "FROM grievance g"
+    ),
+    'postgresql': (
+        f"INSERT INTO {SEARCH_TABLE} (grievance_id, document) "
+        "SELECT g.id, "
+        "setweight(to_tsvector(CAST(:config AS regconfig), coalesce(g.title, '')), 'A') || "
+        "setweight(to_tsvector(CAST(:config AS regconfig), coalesce(g.description, '')), 'B') || "
+        "setweight(to_tsvector(CAST(:config AS regconfig), coalesce(g.address, '')), 'C') || "
+        "setweight(to_tsvector(CAST(:config AS regconfig), coalesce((SELECT string_agg(c.comment_text, ' ') "
+        "FROM grievance_comment c WHERE c.grievance_id = g.id), '')), 'D') "
+        "FROM grievance g"
+    ),
+}
+
+# Higher score is a better match: title > description > address > comments
+_SEARCH = {
+    'sqlite': (
+        f"SELECT {SEARCH_TABLE}.rowid AS id, -bm25({SEARCH_TABLE}, 10.0, 4.0, 2.0, 1.0) AS score "
+        f"FROM {SEARCH_TABLE} JOIN grievance g ON g.id = {SEARCH_TABLE}.rowid "
+        f"WHERE {SEARCH_TABLE} MATCH :query"
+    ),
+    'postgresql': (
+        "SELECT s.grievance_id AS id, CAST(ts_rank(s.document, to_tsquery(CAST(:config AS regconfig), :query)) AS FLOAT8) AS score "
+        f"FROM {SEARCH_TABLE} s JOIN grievance g ON g.id = s.grievance_id "
+        "WHERE s.document @@ to_tsquery(CAST(:config AS regconfig), :query)"
+    ),
+}
+
+def _create_search_table(target, connection, **kw):
+    for statement in _CREATE.get(connection.dialect.name, []):
+        connection.exec_driver_sql(statement)
+
+def _drop_search_table(target, connection, **kw):
+    if connection.dialect.name in SEARCH_DIALECTS:
+        connection.exec_driver_sql(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+# db.create_all() / drop_all() manage the index alongside the tables it is built from
+event.listen(GrievanceComment.__table__, 'after_create', _create_search_table)
+event.listen(Grievance.__table__, 'before_drop', _drop_search_table)
+
+def include_object(object, name, type_, reflected, compare_to):
+    """Alembic hook: keep autogenerate from dropping the search table and its FTS5 shadow tables."""
+    return not (type_ in ('table', 'index') and reflected and compare_to is None
+                and (name or '').startswith(SEARCH_TABLE))
+
+def search_enabled(connection=None):
+    if not has_app_context() or not current_app.config.get('SEARCH_INDEX_ENABLED', True):
+        return False
+    dialect = connection.dialect.name if connection is not None else db.engine.dialect.name
+    return dialect in SEARCH_DIALECTS
+
+def _params(connection, **params):
+    if connection.dialect.name == 'postgresql':
+        params['config'] = current_app.config.get('SEARCH_TEXT_CONFIG', 'simple')
+    return params
+
+def reindex_grievances(ids, connection=None):
+    """Rebuild the search rows of the given grievances; ids that no longer exist are dropped."""
+    connection = connection or db.session.connection()
+    ids = sorted(set(ids))
+    if not ids or not search_enabled(connection):
+        return
+    dialect = connection.dialect.name
+    connection.execute(text(_DELETE[dialect]).bindparams(bindparam('ids', expanding=True)), {'ids': ids})
+    connection.execute(
+        text(_INSERT[dialect] + " WHERE g.id IN :ids").bindparams(bindparam('ids', expanding=True)),
+        _params(connection, ids=ids)
+    )
+
+def rebuild_search_index():
+    """Backfill: recreate the whole search index from the grievance tables and commit."""
+    connection = db.session.connection()
+    if not search_enabled(connection):
+        return 0
+    _create_search_table(None, connection)
+    connection.exec_driver_sql(f"DELETE FROM {SEARCH_TABLE}")
+    connection.execute(text(_INSERT[connection.dialect.name]), _params(connection))
+    db.session.commit()
+    return db.session.query(Grievance.id).count()
+
+def _changed(obj, attributes):
+    state = inspect(obj)
+    return any(state.attrs[name].history.has_changes() for name in attributes)
+
+# Runs inside the flush's transaction, so the index commits or rolls back with the change
+@event.listens_for(Session, 'after_flush')
+def _sync_search_index(session, flush_context):
+    ids = set()
+    for obj in session.new:
+        if isinstance(obj, Grievance):
+            ids.add(obj.id)
+        elif isinstance(obj, GrievanceComment):
+            ids.add(obj.grievance_id)
+    for obj in session.dirty:
+        if isinstance(obj, Grievance) and _changed(obj, _TEXT_ATTRIBUTES):
+            ids.add(obj.id)
+        elif isinstance(obj, GrievanceComment) and _changed(obj, ('comment_text', 'grievance_id')):
+            ids.add(obj.grievance_id)
+            ids.update(inspect(obj).attrs.grievance_id.history.deleted)
+    for obj in session.deleted:
+        if isinstance(obj, Grievance):
+            ids.add(obj.id)
+        elif isinstance(obj, GrievanceComment):
+            ids.add(obj.grievance_id)
+    ids.discard(None)
+    if ids and search_enabled():
+        reindex_grievances(ids, session.connection())
+
+def _match_query(dialect, terms):
+    if dialect == 'sqlite':
+        return ' '.join(f'"{term}"*' for term in terms)
+    return ' & '.join(f"{term}:*" for term in terms)
+
+def search_grievances(q, limit=20, cursor=None, citizen_id=None, status=None, area_id=None):
+    """
+    Grievance ids matching every term of `q` (prefix match), best first.
+    Returns (ids, next_cursor); keyset-paginated on (score, id).
+    """
+    connection = db.session.connection()
+    if not search_enabled(connection):
+        raise ValueError("Full-text search is not available on this database")
+    terms = [term.lower() for term in _TERM.findall(q or '')][:MAX_QUERY_TERMS]
+    if not terms:
+        raise ValueError("Search query must contain at least one word")
+    dialect = connection.dialect.name
+
+    sql = _SEARCH[dialect]
+    params = _params(connection, query=_match_query(dialect, terms), limit=limit + 1)
+    if citizen_id is not None:
+        sql += " AND g.citizen_id = :citizen_id"
+        params['citizen_id'] = citizen_id
+    if status:
+        try:
+            params['status'] = GrievanceStatus(status).name
+        except ValueError:
+            raise ValueError(f"Invalid status. Must be one of {[s.value for s in GrievanceStatus]}")
+        sql += " AND g.status = :status"
+    if area_id is not None:
+        sql += " AND g.area_id = :area_id"
+        params['area_id'] = area_id
+
+    sql = f"SELECT id, score FROM ({sql}) ranked"
+    if cursor:
+        params['score'], params['after_id'] = decode_cursor(cursor)
+        sql += " WHERE score < :score OR (score = :score AND id < :after_id)"
+    sql += " ORDER BY score DESC, id DESC LIMIT :limit"
+
+    rows = connection.execute(text(sql), params).all()
+    next_cursor = encode_cursor(rows[limit - 1].score, rows[limit - 1].id) if len(rows) > limit else None
+    return [row.id for row in rows[:limit]], next_cursor
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from sqlalchemy import update, insert
+from ..models import Grievance, GrievanceStatus, AuditLog
+from .master_data_service import get_config_value
+from .kpi_rollup_service import rollup_enabled, refresh_daily_stats
+from .. import db
+
+def get_sla_closure_days():
+    """Days a RESOLVED grievance waits for the citizen before it is closed."""
+    default = current_app.config.get('SLA_CLOSURE_DAYS', 7)
+    try:
+        return int(get_config_value('SLA_CLOSURE_DAYS', default))
+    except (TypeError, ValueError):
+        return default
+
+def auto_close_resolved_grievances():
+    """
+    Close every RESOLVED grievance whose resolution is older than
+    SLA_CLOSURE_DAYS with one UPDATE, and audit them with one bulk insert.
+    Returns the number of grievances closed.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    cutoff = now - timedelta(days=get_sla_closure_days())
+    closed = db.session.execute(
+        update(Grievance)
+        .where(Grievance.status == GrievanceStatus.RESOLVED, Grievance.resolved_at < cutoff)
+        .values(status=GrievanceStatus.CLOSED, updated_at=now)
+        .returning(Grievance.id, Grievance.assigned_to, Grievance.citizen_id, Grievance.created_at)
+        .execution_options(synchronize_session=False)
+    ).all()
+    if not closed:
+        return 0
+
+    db.session.execute(insert(AuditLog), [
+        {
+            'action': 'Auto-closed due to SLA',
+            'action_type': 'auto_close',
+            'performed_by': row.assigned_to or row.citizen_id,
+            'grievance_id': row.id,
+            'timestamp': now,
+        }
+        for row in closed
+    ])
+    if rollup_enabled():
+        # bulk updates skip the session hooks that keep the rollup current
+        refresh_daily_stats({row.created_at.date() for row in closed if row.created_at})
+    db.session.commit()
+    current_app.logger.info(f"Auto-closed {len(closed)} resolved grievances past SLA")
+    return len(closed)
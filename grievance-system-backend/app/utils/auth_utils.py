@@ -1,21 +1,90 @@
 from functools import wraps
+import threading
+import time
 from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
-from flask import jsonify
+from flask import jsonify, current_app
+from sqlalchemy import event
 from ..models import User, Role
 from .. import db
+
+# user_id -> (expires_at, column snapshot)
+_user_cache = {}
+_user_cache_lock = threading.Lock()
+
+def get_cached_user(user_id):
+    """
+    Return a dict of the User's column values, served from a short-TTL
+    in-process cache. Returns None if the user does not exist.
+    """
+    user_id = int(user_id)
+    now = time.monotonic()
+    entry = _user_cache.get(user_id)
+    if entry and entry[0] > now:
+        return entry[1]
+
+    user = db.session.get(User, user_id)
+    if not user:
+        return None
+    snapshot = {column.key: getattr(user, column.key) for column in User.__table__.columns}
+    ttl = current_app.config.get('USER_CACHE_TTL', 30)
+    if ttl > 0:
+        with _user_cache_lock:
+            _user_cache[user_id] = (now + ttl, snapshot)
+    return snapshot
+
+def invalidate_user(user_id):
+    with _user_cache_lock:
+        _user_cache.pop(int(user_id), None)
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_user_on_change(mapper, connection, target):
+    invalidate_user(target.id)
+
+class CurrentUser:
+    """
+    The authenticated user passed to route handlers. id, role and department_id
+    are read fresh for the request; other columns come from the user cache and
+    methods or relationships go to the ORM row, available as `model`.
+    """
+    def __init__(self, id, role, department_id=None):
+        self.id = id
+        self.role = role
+        self.department_id = department_id
+
+    @property
+    def model(self):
+        return db.session.get(User, self.id)
+
+    def __getattr__(self, name):
+        snapshot = get_cached_user(self.id)
+        if snapshot is not None and name in snapshot:
+            return snapshot[name]
+        return getattr(self.model, name)
+
+    def __repr__(self):
+        return f"<CurrentUser {self.id} {self.role}>"
+
+def _current_user():
+    verify_jwt_in_request()
+    current_user_id = int(get_jwt_identity())
+    # Deliberately a database read, not token claims or a per-process cache:
+    # a demotion or deletion must apply on every worker at once. Two columns by primary key.
+    row = db.session.query(User.role, User.department_id).filter(User.id == current_user_id).first()
+    if row is None:
+        return None
+    return CurrentUser(current_user_id, row.role, row.department_id)
+
 def jwt_required_with_role(roles):
     def wrapper(fn):
         @wraps(fn)
         def decorator(*args, **kwargs):
-            verify_jwt_in_request()
-            current_user_id = get_jwt_identity()
-            print(f"JWT Identity: {current_user_id}")
-            user = db.session.get(User, current_user_id)
+            user = _current_user()
             if not user:
-                print("User not found for ID:", current_user_id)
+                current_app.logger.warning(f"User not found for ID: {get_jwt_identity()}")
                 return jsonify({"msg": "User not found"}), 404
             if user.role not in roles:
-                print(f"Access forbidden: User role {user.role} not in {roles}")
+                current_app.logger.warning(f"Access forbidden: User role {user.role} not in {roles}")
                 return jsonify({"msg": "Access forbidden"}), 403
             return fn(user, *args, **kwargs)
         return decorator
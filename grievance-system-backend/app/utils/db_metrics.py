@@ -0,0 +1,63 @@
+# app/utils/db_metrics.py
+
+import threading
+import time
+from sqlalchemy import event
+
+_lock = threading.Lock()
+# engine url -> counters since process start
+_counters = {}
+
+def _bump(key, name, value=1):
+    with _lock:
+        counters = _counters[key]
+        counters[name] += value
+        return counters
+
+def install_pool_metrics(engine):
+    """Count connects, checkouts and invalidations on `engine`'s pool."""
+    key = engine.url.render_as_string(hide_password=True)
+    if key in _counters:
+        return
+    _counters[key] = {'connects': 0, 'checkouts': 0, 'invalidations': 0,
+                      'checked_out': 0, 'peak_checked_out': 0, 'checkout_seconds': 0.0}
+
+    @event.listens_for(engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        _bump(key, 'connects')
+
+    @event.listens_for(engine, 'checkout')
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info['checked_out_at'] = time.monotonic()
+        _bump(key, 'checkouts')
+        counters = _bump(key, 'checked_out')
+        with _lock:
+            counters['peak_checked_out'] = max(counters['peak_checked_out'], counters['checked_out'])
+
+    @event.listens_for(engine, 'checkin')
+    def _on_checkin(dbapi_connection, connection_record):
+        started = connection_record.info.pop('checked_out_at', None)
+        if started is not None:
+            _bump(key, 'checked_out', -1)
+            _bump(key, 'checkout_seconds', time.monotonic() - started)
+
+    @event.listens_for(engine, 'invalidate')
+    def _on_invalidate(dbapi_connection, connection_record, exception):
+        _bump(key, 'invalidations')
+
+def pool_status(engine):
+    """Current pool occupancy plus the counters collected by install_pool_metrics."""
+    pool = engine.pool
+    status = {'pool': type(pool).__name__}
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        method = getattr(pool, name, None)
+        if callable(method):
+            status[name] = method()
+    with _lock:
+        counters = dict(_counters.get(engine.url.render_as_string(hide_password=True), {}))
+    counters.pop('checked_out', None)
+    if counters.get('checkouts'):
+        counters['avg_checkout_ms'] = round(counters['checkout_seconds'] / counters['checkouts'] * 1000, 2)
+    counters.pop('checkout_seconds', None)
+    status.update(counters)
+    return status
@@ -0,0 +1,106 @@
+# app/utils/db_routing.py
+
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+REPLICA_BIND = 'replica'
+# Unix time until which the client's reads stay on the primary. Sent back as a
+# cookie and a header so it reaches whichever worker serves the next request;
+# clients that don't keep cookies echo the header.
+STICKY_COOKIE = 'replica_sticky_until'
+STICKY_HEADER = 'X-Replica-Sticky-Until'
+
+def _sticky_until():
+    if not has_request_context():
+        return 0.0
+    if 'replica_sticky_until' in g:
+        return g.replica_sticky_until
+    value = request.cookies.get(STICKY_COOKIE) or request.headers.get(STICKY_HEADER)
+    try:
+        until = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    # a client can only ask for the primary, and never for longer than one window
+    return min(until, time.time() + current_app.config.get('REPLICA_STICKY_SECONDS', 5))
+
+def _reads_own_writes():
+    return _sticky_until() > time.time()
+
+def install_read_your_writes(app):
+    """After a request that committed a write, tell the client to stay on the primary for a while."""
+    if not app.config.get('SQLALCHEMY_BINDS', {}).get(REPLICA_BIND):
+        return
+
+    @app.after_request
+    def _set_sticky(response):
+        until = g.get('replica_sticky_until')
+        if until:
+            max_age = max(int(until - time.time()) + 1, 1)
+            response.set_cookie(STICKY_COOKIE, f"{until:.3f}", max_age=max_age, httponly=True, samesite='Lax')
+            response.headers[STICKY_HEADER] = f"{until:.3f}"
+        return response
+
+class RoutingSession(Session):
+    """
+    db.session that sends plain SELECTs to the 'replica' bind inside
+    replica_reads(). Writes, SELECT ... FOR UPDATE, reads after this
+    transaction has written, and reads by a client that committed a write in
+    the last REPLICA_STICKY_SECONDS (on any worker) all stay on the primary.
+    Without a replica bind configured everything goes to the primary.
+    """
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get('replica_reads') and self._replica_safe(clause):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _replica_safe(self, clause):
+        if clause is None or not getattr(clause, 'is_select', False):
+            return False
+        if getattr(clause, '_for_update_arg', None) is not None:
+            return False
+        if self._flushing or self.info.get('has_writes'):
+            return False
+        return not _reads_own_writes()
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _flushed(session, flush_context):
+    session.info['has_writes'] = True
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _bulk_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info['has_writes'] = True
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _committed(session):
+    if session.info.pop('has_writes', False) and has_request_context():
+        g.replica_sticky_until = time.time() + current_app.config.get('REPLICA_STICKY_SECONDS', 5)
+
+@event.listens_for(RoutingSession, 'after_rollback')
+def _rolled_back(session):
+    session.info.pop('has_writes', None)
+
+@contextmanager
+def replica_reads():
+    """Route the reads of db.session to the replica inside the block."""
+    from .. import db
+    previous = db.session.info.get('replica_reads', False)
+    db.session.info['replica_reads'] = True
+    try:
+        yield
+    finally:
+        db.session.info['replica_reads'] = previous
+
+def read_from_replica(fn):
+    """Run a read-only view or service function under replica_reads()."""
+    @wraps(fn)
+    def decorator(*args, **kwargs):
+        with replica_reads():
+            return fn(*args, **kwargs)
+    return decorator
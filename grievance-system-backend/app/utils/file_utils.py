@@ -57,4 +57,16 @@ def upload_workproof(file, grievance_id):
     filename = secure_filename(file.filename)
     absolute_file_path = os.path.join(absolute_workproof_folder, filename)
     file.save(absolute_file_path)
-    return os.path.join(relative_workproof_folder, filename).replace('\\', '/')
\ No newline at end of file
+    return os.path.join(relative_workproof_folder, filename).replace('\\', '/')
+
+def stream_and_remove(path, chunk_size=64 * 1024):
+    """Yield a temporary file in chunks and delete it once the response is done."""
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.remove(path)
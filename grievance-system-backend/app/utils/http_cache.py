@@ -0,0 +1,51 @@
+# app/utils/http_cache.py
+
+from datetime import timezone
+from flask import request, make_response
+from sqlalchemy import func
+
+def _not_modified(version, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains(version)
+    if request.if_modified_since and last_modified:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+def conditional_response(version, build, last_modified=None):
+    """
+    Serve a GET with a strong ETag of `version` (and Last-Modified when given).
+    Answers 304 without calling `build` when the client already holds that
+    version; otherwise `build()` returns whatever the view would normally return.
+    """
+    if last_modified is not None and last_modified.tzinfo is None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc)
+
+    if _not_modified(version, last_modified):
+        response = make_response('', 304)
+    else:
+        response = make_response(build())
+        if response.status_code != 200:
+            return response
+    response.set_etag(version)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def table_version(query, id_column, timestamp_column=None):
+    """
+    Cheap version of a result set from one aggregate row: it changes whenever a
+    row enters or leaves the set, or (with `timestamp_column`) is updated.
+    Returns (version, last_modified).
+    """
+    columns = [func.count(id_column), func.max(id_column), func.sum(id_column)]
+    if timestamp_column is not None:
+        columns.append(func.max(timestamp_column))
+    row = query.with_entities(*columns).one()
+    last_modified = row[3] if timestamp_column is not None else None
+    version = '-'.join(str(v) if v is not None else '0' for v in row[:3])
+    if last_modified is not None:
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        version += f"-{int(last_modified.timestamp() * 1000000)}"
+    return version, last_modified
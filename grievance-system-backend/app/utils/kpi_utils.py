@@ -1,9 +1,41 @@
 # app/utils/kpi_utils.py
 
-from datetime import datetime, timedelta
-from ..models import Grievance, GrievanceStatus, MasterAreas
+from datetime import datetime, timedelta, timezone
+from ..models import Grievance, GrievanceStatus, MasterAreas, User
 from .. import db
-from sqlalchemy import func
+from sqlalchemy import func, case, literal_column, Float
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+PENDING_EXCLUDED = [GrievanceStatus.CLOSED, GrievanceStatus.REJECTED]
+PERIOD_DELTAS = {
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+    'month': timedelta(days=30),
+    'year': timedelta(days=365),
+}
+
+class days_between(FunctionElement):
+    """SQL expression for the number of days (fractional) from `start` to `end`."""
+    type = Float()
+    inherit_cache = True
+    name = 'days_between'
+
+    def __init__(self, start, end):
+        super().__init__(start, end)
+
+@compiles(days_between)
+def _days_between_sqlite(element, compiler, **kw):
+    start, end = (compiler.process(clause, **kw) for clause in element.clauses)
+    return f"(julianday({end}) - julianday({start}))"
+
+@compiles(days_between, 'postgresql')
+def _days_between_postgresql(element, compiler, **kw):
+    start, end = (compiler.process(clause, **kw) for clause in element.clauses)
+    return f"(EXTRACT(EPOCH FROM ({end}) - ({start})) / 86400.0)"
+
+def _count_if(condition):
+    return func.sum(case((condition, 1), else_=0))
 
 def calculate_resolution_rate():
     total_resolved = Grievance.query.filter_by(status=GrievanceStatus.CLOSED).count()
@@ -12,7 +44,7 @@ def calculate_resolution_rate():
 
 def calculate_pending_aging():
     pending = Grievance.query.filter(Grievance.status.notin_([GrievanceStatus.CLOSED, GrievanceStatus.REJECTED]))
-    aging = db.session.query(func.avg(func.julianday(datetime.utcnow()) - func.julianday(Grievance.created_at))).filter(Grievance.status.notin_([GrievanceStatus.CLOSED, GrievanceStatus.REJECTED])).scalar()
+    aging = db.session.query(func.avg(days_between(Grievance.created_at, datetime.utcnow()))).filter(Grievance.status.notin_([GrievanceStatus.CLOSED, GrievanceStatus.REJECTED])).scalar()
     return {
         'pending_count': pending.count(),
         'average_aging_days': aging or 0
@@ -25,4 +57,129 @@ def calculate_sla_compliance():
     return (compliant / total_resolved * 100) if total_resolved > 0 else 0
 
 def calculate_dept_wise_resolution():
-    return db.session.query(MasterAreas.name, func.avg(Grievance.updated_at - Grievance.created_at)).join(MasterAreas).group_by(MasterAreas.id).all()
\ No newline at end of file
+    return db.session.query(MasterAreas.name, func.avg(Grievance.updated_at - Grievance.created_at)).join(MasterAreas).group_by(MasterAreas.id).all()
+
+def calculate_dashboard_kpis(sla_days=30):
+    """
+    Resolution rate, pending aging and SLA compliance from a single aggregate
+    scan. Same shape as calling the three calculate_* functions above.
+    """
+    closed = Grievance.status == GrievanceStatus.CLOSED
+    pending = Grievance.status.notin_(PENDING_EXCLUDED)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    row = db.session.query(
+        func.count(Grievance.id),
+        _count_if(closed),
+        _count_if(pending),
+        func.avg(case((pending, days_between(Grievance.created_at, now)))),
+        _count_if(closed & (days_between(Grievance.created_at, Grievance.updated_at) <= sla_days)),
+    ).one()
+    return dashboard_summary(*row)
+
+def dashboard_summary(total, total_closed, pending_count, aging, compliant):
+    """Shape the dashboard aggregates (counts may be None on an empty table)."""
+    total, total_closed, pending_count, compliant = (total or 0, total_closed or 0, pending_count or 0, compliant or 0)
+    return {
+        'resolution_rate': (total_closed / total * 100) if total > 0 else 0,
+        'pending_aging': {
+            'pending_count': pending_count,
+            'average_aging_days': aging or 0
+        },
+        'sla_compliance': (compliant / total_closed * 100) if total_closed > 0 else 0
+    }
+
+def calculate_grievance_kpis(time_period='all', sla_days=7, area_names=None):
+    """
+    Everything get_advanced_kpis reports, from one scan of the grievance table
+    grouped by (status, area, assignee, in-period) with conditional sums.
+    `area_names` maps area id -> name; missing areas are looked up.
+    """
+    now = datetime.now(timezone.utc)
+    closed = Grievance.status == GrievanceStatus.CLOSED
+    resolution_days = days_between(Grievance.created_at, Grievance.updated_at)
+
+    period_start = now - PERIOD_DELTAS[time_period] if time_period in PERIOD_DELTAS else None
+    group_columns = [Grievance.status, Grievance.area_id, Grievance.assigned_to, User.name]
+    group_by = list(group_columns)
+    if period_start is not None:
+        # grouped by its output name: Postgres won't match a repeated expression with fresh bind params
+        group_columns.append(case((Grievance.created_at >= period_start, 1), else_=0).label('in_period'))
+        group_by.append(literal_column('in_period'))
+
+    rows = (
+        db.session.query(
+            *group_columns,
+            func.count(Grievance.id),
+            *[_count_if(Grievance.created_at >= now - delta) for delta in PERIOD_DELTAS.values()],
+            _count_if(closed & (resolution_days <= sla_days)),
+            func.sum(case((closed, resolution_days), else_=0)),
+        )
+        .outerjoin(User, User.id == Grievance.assigned_to)
+        .group_by(*group_by)
+        .all()
+    )
+    return grievance_kpi_summary(rows, period_start is not None, sla_days, area_names)
+
+def grievance_kpi_summary(rows, with_period, sla_days, area_names=None):
+    """
+    Fold grouped KPI rows into the get_advanced_kpis response. Each row is
+    (status, area_id, assigned_to, staff_name[, in_period], count,
+    <one count per PERIOD_DELTAS entry>, sla_compliant, resolution_days_sum).
+    """
+    total_complaints = {period: 0 for period in PERIOD_DELTAS}
+    total_complaints['all'] = 0
+    status_overview = {status.value: 0 for status in GrievanceStatus}
+    dept_counts = {}
+    staff_performance = {}
+    sla_compliant = total_resolved = 0
+    resolution_days_sum = 0.0
+
+    for row in rows:
+        status, area_id, assigned_to, staff_name = row[:4]
+        if with_period:
+            row_in_period, rest = row[4], row[5:]
+        else:
+            row_in_period, rest = 1, row[4:]
+        count, period_counts = rest[0], rest[1:1 + len(PERIOD_DELTAS)]
+        compliant, days_sum = rest[1 + len(PERIOD_DELTAS):]
+
+        total_complaints['all'] += count
+        for period, period_count in zip(PERIOD_DELTAS, period_counts):
+            total_complaints[period] += period_count or 0
+        if not row_in_period:
+            continue
+
+        status_overview[status.value] += count
+        dept_counts[area_id] = dept_counts.get(area_id, 0) + count
+        if status == GrievanceStatus.CLOSED:
+            sla_compliant += compliant or 0
+            total_resolved += count
+            resolution_days_sum += days_sum or 0
+            if assigned_to is not None:
+                staff_performance[staff_name] = staff_performance.get(staff_name, 0) + count
+
+    area_names = dict(area_names or {})
+    missing = [area_id for area_id in dept_counts if area_id not in area_names]
+    if missing:
+        area_names.update(db.session.query(MasterAreas.id, MasterAreas.name).filter(MasterAreas.id.in_(missing)).all())
+    dept_wise = {}
+    for area_id, count in dept_counts.items():
+        if area_id in area_names:
+            name = area_names[area_id]
+            dept_wise[name] = dept_wise.get(name, 0) + count
+
+    sla_compliance_rate = (sla_compliant / total_resolved * 100) if total_resolved > 0 else 0
+    avg_resolution_time = (resolution_days_sum / total_resolved) if total_resolved > 0 else 0
+    return {
+        'total_complaints': total_complaints,
+        'status_overview': status_overview,
+        'dept_wise': dept_wise,
+        'sla_metrics': {
+            'sla_days': sla_days,
+            'sla_compliant': sla_compliant,
+            'total_resolved': total_resolved,
+            'sla_compliance_rate': round(sla_compliance_rate, 2),
+            'avg_resolution_time_days': round(avg_resolution_time, 2)
+        },
+        'staff_performance': staff_performance
+    }
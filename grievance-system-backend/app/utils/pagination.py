@@ -0,0 +1,98 @@
+# app/utils/pagination.py
+
+import base64
+import json
+from datetime import datetime
+from flask import request, current_app, g, has_request_context
+from sqlalchemy import or_, and_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# Set on responses whose unpaginated list was cut at MAX_PAGE_SIZE
+TRUNCATED_HEADER = 'X-Result-Truncated'
+
+def encode_cursor(sort_value, row_id):
+    """Opaque cursor for (sort_value, row_id); sort_value is a datetime or a number."""
+    if isinstance(sort_value, datetime):
+        sort_value = sort_value.isoformat()
+    payload = json.dumps([sort_value, row_id])
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor):
+    try:
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        if isinstance(sort_value, str):
+            sort_value = datetime.fromisoformat(sort_value)
+        return sort_value, int(row_id)
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def get_page_args():
+    """
+    Read `limit` and `cursor` from the query string.
+    Returns (None, None) when the caller did not ask for pagination; those
+    callers still get at most MAX_PAGE_SIZE rows (see unpaginated()).
+    """
+    cursor = request.args.get('cursor') or None
+    limit = request.args.get('limit')
+    if limit is None and cursor is None:
+        return None, None
+    try:
+        limit = int(limit) if limit is not None else current_app.config.get('DEFAULT_PAGE_SIZE', DEFAULT_PAGE_SIZE)
+    except ValueError:
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return min(limit, current_app.config.get('MAX_PAGE_SIZE', MAX_PAGE_SIZE)), cursor
+
+def max_page_size():
+    return current_app.config.get('MAX_PAGE_SIZE', MAX_PAGE_SIZE)
+
+def unpaginated(rows):
+    """
+    Cap the plain list sent to a caller that did not paginate: the first
+    MAX_PAGE_SIZE of `rows` (fetch one more to detect the cut). A cut list
+    is flagged with the X-Result-Truncated response header.
+    """
+    cap = max_page_size()
+    if len(rows) <= cap:
+        return rows
+    if has_request_context():
+        g.page_truncated = True
+    return rows[:cap]
+
+def install_truncation_header(app):
+    @app.after_request
+    def _mark_truncated(response):
+        if g.get('page_truncated'):
+            response.headers[TRUNCATED_HEADER] = 'true'
+        return response
+
+def keyset_paginate(query, sort_column, id_column, limit=None, cursor=None, loader=None):
+    """
+    Order `query` newest first on (sort_column, id_column) and return one page.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    loader = loader or (lambda q: q.all())
+    query = query.order_by(sort_column.desc(), id_column.desc())
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            sort_column < sort_value,
+            and_(sort_column == sort_value, id_column < row_id)
+        ))
+    if limit is None:
+        return unpaginated(loader(query.limit(max_page_size() + 1))), None
+
+    rows = loader(query.limit(limit + 1))
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
+
+def page_response(items, limit, next_cursor):
+    """Plain list for unpaginated callers, an items/next_cursor envelope otherwise."""
+    if limit is None:
+        return items
+    return {'items': items, 'next_cursor': next_cursor, 'limit': limit}
@@ -0,0 +1,53 @@
+# app/utils/scheduler.py
+
+import threading
+import time
+from .. import db
+
+class Scheduler:
+    """
+    Minimal periodic runner. Jobs share one thread and each run gets its own
+    app context and session. The sweeps must run in exactly one process:
+    run_scheduler.py in production, or SCHEDULER_ENABLED=true on a single
+    development server.
+    """
+    def __init__(self):
+        self._jobs = {}
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def add_job(self, name, func, interval, delay=None):
+        """Run `func()` every `interval` seconds, first after `delay` (default: one interval)."""
+        if interval <= 0:
+            return
+        first = interval if delay is None else delay
+        self._jobs[name] = {'func': func, 'interval': interval, 'next_run': time.monotonic() + first}
+
+    def start(self, app, tick=1.0):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self.run_forever, args=(app, tick), name='scheduler', daemon=True)
+            self._thread.start()
+
+    def run_pending(self, app):
+        now = time.monotonic()
+        for name, job in list(self._jobs.items()):
+            if job['next_run'] > now:
+                continue
+            job['next_run'] = now + job['interval']
+            with app.app_context():
+                try:
+                    job['func']()
+                except Exception:
+                    db.session.rollback()
+                    app.logger.exception(f"Scheduled job {name} failed")
+                finally:
+                    db.session.remove()
+
+    def run_forever(self, app, tick=1.0):
+        while True:
+            time.sleep(tick)
+            self.run_pending(app)
+
+scheduler = Scheduler()
@@ -0,0 +1,47 @@
+# app/utils/sqlite_pragmas.py
+
+from flask import current_app
+from sqlalchemy import event
+from .. import db
+
+def install_sqlite_pragmas(engine, config):
+    """
+    Set the SQLITE_* pragmas from `config` on every new connection of a SQLite
+    engine. WAL lets readers carry on while a write is in progress, and
+    busy_timeout makes a second writer wait instead of failing with
+    "database is locked". Other engines are left alone.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = [
+        ('journal_mode', config.get('SQLITE_JOURNAL_MODE')),
+        ('synchronous', config.get('SQLITE_SYNCHRONOUS')),
+        ('busy_timeout', config.get('SQLITE_BUSY_TIMEOUT')),
+        ('cache_size', config.get('SQLITE_CACHE_SIZE')),
+        ('mmap_size', config.get('SQLITE_MMAP_SIZE')),
+    ]
+    pragmas = [(name, value) for name, value in pragmas if value is not None]
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+def checkpoint_wal():
+    """
+    Copy the WAL back into the database file so it does not keep growing
+    under constant reads. Returns (busy, wal_frames, checkpointed_frames),
+    or None when the database is not SQLite.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return None
+    mode = current_app.config.get('SQLITE_CHECKPOINT_MODE', 'PASSIVE')
+    with db.engine.connect() as connection:
+        result = tuple(connection.exec_driver_sql(f"PRAGMA wal_checkpoint({mode})").one())
+    if result[0]:
+        current_app.logger.warning(f"WAL checkpoint ({mode}) blocked by active connections: {result}")
+    return result
@@ -0,0 +1,9 @@
+# backfill_kpi_rollup.py
+from app import create_app
+from app.services.kpi_rollup_service import rebuild_daily_stats
+
+if __name__ == "__main__":
+    app = create_app()
+    with app.app_context():
+        rows = rebuild_daily_stats()
+        print(f"✅ Rebuilt grievance_daily_stats with {rows} rows")
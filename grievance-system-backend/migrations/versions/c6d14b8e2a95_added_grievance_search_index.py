@@ -0,0 +1,58 @@
+"""Added grievance full-text search index
+
+Revision ID: c6d14b8e2a95
+Revises: a3c71e9d4f20
+Create Date: 2026-10-18 16:05:41.218307
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from flask import current_app
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6d14b8e2a95'
+down_revision = 'a3c71e9d4f20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Not a model table (FTS5 virtual table / tsvector + GIN), so written by hand;
+    # kept in step with app/services/search_service.py
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS grievance_search USING fts5("
+            "title, description, address, comments, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "INSERT INTO grievance_search (rowid, title, description, address, comments) "
+            "SELECT g.id, g.title, g.description, coalesce(g.address, ''), "
+            "coalesce((SELECT group_concat(c.comment_text, ' ') FROM grievance_comment c WHERE c.grievance_id = g.id), '') "
+            "FROM grievance g"
+        )
+    elif bind.dialect.name == 'postgresql':
+        op.execute(
+            "CREATE TABLE IF NOT EXISTS grievance_search ("
+            "grievance_id INTEGER PRIMARY KEY REFERENCES grievance (id) ON DELETE CASCADE, "
+            "document TSVECTOR NOT NULL)"
+        )
+        op.execute("CREATE INDEX IF NOT EXISTS ix_grievance_search_document ON grievance_search USING GIN (document)")
+        # same text search config as search_service, or migrated rows won't match queries
+        config = current_app.config.get('SEARCH_TEXT_CONFIG', 'simple')
+        bind.execute(sa.text(
+            "INSERT INTO grievance_search (grievance_id, document) "
+            "SELECT g.id, "
+            "setweight(to_tsvector(CAST(:config AS regconfig), coalesce(g.title, '')), 'A') || "
+            "setweight(to_tsvector(CAST(:config AS regconfig), coalesce(g.description, '')), 'B') || "
+            "setweight(to_tsvector(CAST(:config AS regconfig), coalesce(g.address, '')), 'C') || "
+            "setweight(to_tsvector(CAST(:config AS regconfig), coalesce((SELECT string_agg(c.comment_text, ' ') "
+            "FROM grievance_comment c WHERE c.grievance_id = g.id), '')), 'D') "
+            "FROM grievance g"
+        ), {'config': config})
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name in ('sqlite', 'postgresql'):
+        op.execute("DROP TABLE IF EXISTS grievance_search")
@@ -0,0 +1,9 @@
+# rebuild_search_index.py
+from app import create_app
+from app.services.search_service import rebuild_search_index
+
+if __name__ == "__main__":
+    app = create_app()
+    with app.app_context():
+        count = rebuild_search_index()
+        print(f"✅ Rebuilt grievance_search for {count} grievances")
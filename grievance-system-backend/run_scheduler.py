@@ -0,0 +1,21 @@
+# run_scheduler.py
+"""
+Runs the periodic jobs (auto-close, escalation, report purge, WAL checkpoint)
+in the foreground. Start exactly one of these next to the web workers.
+"""
+import os
+
+# this process owns the jobs; don't also start the background thread
+os.environ['SCHEDULER_ENABLED'] = 'false'
+
+from app import create_app, register_scheduled_jobs
+from app.utils.scheduler import scheduler
+
+if __name__ == "__main__":
+    app = create_app()
+    register_scheduled_jobs(app)
+    print("✅ Scheduler running; Ctrl+C to stop")
+    try:
+        scheduler.run_forever(app)
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,253 @@
+# test_query_plans.py
+"""
+Query-plan regression check for the hot read paths.
+
+Seeds a throwaway database with a large synthetic dataset, runs every list,
+KPI and report path below, and fails when one of them issues more queries
+than its budget or a statement that reads a large table without an index.
+Uses a temporary SQLite file by default; set QUERY_PLAN_DATABASE_URL to an
+empty Postgres database to check its plans instead (its tables are dropped
+afterwards).
+
+    python test_query_plans.py [--rows 50000] [--verbose]
+"""
+import argparse
+import logging
+import os
+import re
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+_tmpdir = tempfile.mkdtemp(prefix='query-plans-')
+os.environ['DATABASE_URL'] = (os.environ.get('QUERY_PLAN_DATABASE_URL')
+                              or f"sqlite:///{os.path.join(_tmpdir, 'plans.db')}")
+os.environ['SCHEDULER_ENABLED'] = 'false'
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, insert, text
+from app import create_app, db
+from app.models import (
+    User, Role, Grievance, GrievanceStatus, Priority, GrievanceComment, GrievanceAttachment,
+    Workproof, AuditLog, MasterSubjects, MasterAreas, MasterCategories
+)
+from app.services.kpi_rollup_service import rebuild_daily_stats
+from app.services.report_service import stream_report_csv, get_location_reports
+from app.services.sla_service import auto_close_resolved_grievances
+from app.services.escalation_service import escalate_overdue_grievances
+from app.services.search_service import rebuild_search_index
+from app.services.duplicate_service import find_duplicate_candidates
+
+# Tables that grow with usage; a full scan of any of these is a regression
+LARGE_TABLES = {'grievance', 'audit_log', 'grievance_comment', 'grievance_attachment',
+                'comment_attachment', 'workproof'}
+
+# (role, path, query budget, large tables the request may scan in full, config overrides)
+# Budgets are the designed query counts, not measurements, and do not grow with
+# page size: a grievance list or detail is 1 auth lookup + 1 SELECT with the
+# many-to-one relations joined + 4 IN queries (attachments, comments with their
+# users, comment attachments, workproofs) = 6; search adds its index query.
+ROUTES = [
+    ("citizen", "/grievances/mine?limit=20", 6, (), {}),
+    ("citizen", "/grievances/track?limit=20", 6, (), {}),
+    ("citizen", "/grievances/{grievance_id}", 6, (), {}),
+    ("field_staff", "/grievances/assigned?limit=20", 6, (), {}),
+    ("member_head", "/grievances/all?limit=20", 6, (), {}),
+    ("admin", "/admins/grievances/all?limit=20", 6, (), {}),
+    ("admin", "/admins/grievances/all?status=NEW&limit=20", 6, (), {}),
+    ("admin", "/admins/grievances/all?priority=URGENT&limit=20", 6, (), {}),
+    ("admin", "/admins/grievances/all?area_id={area_id}&limit=20", 6, (), {}),
+    ("admin", "/admins/grievances/all?subject_id={subject_id}&limit=20", 6, (), {}),
+    ("citizen", "/grievances/search?q=grievance&limit=20", 7, (), {}),
+    ("admin", "/grievances/search?q=synthetic+check&limit=20", 7, (), {}),
+    ("admin", "/grievances/search?q=grievance&status=new&area_id={area_id}&limit=20", 6, (), {}),
+    ("admin", "/admins/audit-logs?limit=50", 3, (), {}),
+    ("admin", "/admins/audit-logs?limit=50&grievance_id={grievance_id}", 3, (), {}),
+    ("admin", "/admins/audit-logs?limit=50&performed_by={staff_id}", 3, (), {}),
+    ("admin", "/admins/audit-logs?limit=50&action_type=status_change", 3, (), {}),
+    # live KPIs aggregate the whole table by design; the rollup must not touch it
+    ("admin", "/admins/dashboard", 3, ('grievance',), {'KPI_ROLLUP_ENABLED': False}),
+    ("admin", "/admins/reports/kpis/advanced?time_period=week", 4, ('grievance',), {'KPI_ROLLUP_ENABLED': False}),
+    ("admin", "/admins/dashboard", 3, (), {'KPI_ROLLUP_ENABLED': True}),
+    ("admin", "/admins/reports/kpis/advanced?time_period=week", 4, (), {'KPI_ROLLUP_ENABLED': True}),
+    ("admin", "/admins/reports/location", 3, ('grievance',), {}),
+    ("admin", "/admins/reports/staff-performance", 3, ('grievance',), {}),
+]
+
+# (name, callable, query budget, large tables it may scan in full); run in order after ROUTES
+SERVICES = [
+    ("stream_report_csv('week')", lambda: list(stream_report_csv('week')), 3, ()),
+    ("stream_report_csv('month', area_id)", lambda: list(stream_report_csv('month', area_id=_ids['area_id'])), 3, ()),
+    ("get_location_reports()", get_location_reports, 2, ('grievance',)),
+    ("find_duplicate_candidates()", lambda: find_duplicate_candidates(
+        _ids['area_id'], _ids['subject_id'], "Pothole", "Deep pothole on the main road", 18.62, 73.80), 3, ()),
+    ("auto_close_resolved_grievances()", auto_close_resolved_grievances, 2, ()),
+    ("escalate_overdue_grievances()", escalate_overdue_grievances, 2, ()),
+]
+
+_ids = {}
+_statements = []
+
+def _record(conn, cursor, statement, parameters, context, executemany):
+    # batched bulk inserts grow with the data set, so only single statements count
+    if not executemany:
+        _statements.append((statement, parameters))
+
+def seed(rows):
+    """Bulk-insert a synthetic dataset of `rows` grievances plus their children."""
+    now = datetime.utcnow()
+    category = MasterCategories(name="Roads", description="Road-related issues")
+    db.session.add(category)
+    db.session.flush()
+    areas = [MasterAreas(name=f"Ward {i}", description="") for i in range(20)]
+    subjects = [MasterSubjects(name=f"Subject {i}", description="", category_id=category.id) for i in range(20)]
+    db.session.add_all(areas + subjects)
+    db.session.flush()
+
+    users = {}
+    for role in Role:
+        for i in range(50 if role == Role.CITIZEN else 10):
+            user = User(name=f"{role.value} {i}", email=f"{role.value}{i}@plans.test", role=role,
+                        department_id=areas[i % len(areas)].id)
+            users.setdefault(role, []).append(user)
+    db.session.add_all([user for group in users.values() for user in group])
+    db.session.flush()
+    citizens, staff = users[Role.CITIZEN], users[Role.FIELD_STAFF]
+    statuses, priorities = list(GrievanceStatus), list(Priority)
+
+    grievances = []
+    for i in range(rows):
+        status = statuses[i % len(statuses)]
+        created_at = now - timedelta(minutes=i * 7)
+        grievances.append({
+            'complaint_id': f"P{i:08d}",
+            'citizen_id': citizens[i % len(citizens)].id,
+            'subject_id': subjects[i % len(subjects)].id,
+            'area_id': areas[i % len(areas)].id,
+            'title': f"Grievance {i}",
+            'description': "Synthetic grievance for query plan checks",
+            'ward_number': str(i % 40),
+            'status': status,
+            'priority': priorities[i % len(priorities)],
+            # every fifth grievance unassigned; the rest spread over all staff, staff[0] included
+            'assigned_to': staff[(i // 5) % len(staff)].id if i % 5 else None,
+            'resolved_at': created_at + timedelta(days=1) if status == GrievanceStatus.RESOLVED else None,
+            'created_at': created_at,
+            'updated_at': created_at + timedelta(hours=i % 200),
+            'escalation_level': 0,
+        })
+    for start in range(0, rows, 5000):
+        db.session.execute(insert(Grievance), grievances[start:start + 5000])
+    grievance_ids = [row.id for row in db.session.query(Grievance.id).order_by(Grievance.id)]
+
+    children = {GrievanceComment: [], GrievanceAttachment: [], Workproof: [], AuditLog: []}
+    for i, grievance_id in enumerate(grievance_ids):
+        actor = staff[i % len(staff)].id
+        children[GrievanceComment].append({'grievance_id': grievance_id, 'user_id': actor, 'comment_text': "Looking into it"})
+        children[GrievanceAttachment].append({'grievance_id': grievance_id, 'file_path': f"{i}.png", 'file_type': 'png'})
+        children[AuditLog].append({'grievance_id': grievance_id, 'performed_by': actor, 'action': "Status updated",
+                                   'action_type': 'status_change', 'timestamp': now - timedelta(minutes=i)})
+        if i % 2:
+            children[Workproof].append({'grievance_id': grievance_id, 'uploaded_by': actor, 'file_path': f"{i}.jpg",
+                                        'file_type': 'jpg', 'file_size': 1, 'notes': "Done"})
+    for model, values in children.items():
+        for start in range(0, len(values), 5000):
+            db.session.execute(insert(model), values[start:start + 5000])
+    db.session.commit()
+    rebuild_daily_stats()
+    rebuild_search_index()
+    if db.engine.dialect.name in ('sqlite', 'postgresql'):
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+
+    _ids.update(grievance_id=grievance_ids[len(grievance_ids) // 2], area_id=areas[3].id,
+                subject_id=subjects[3].id, staff_id=staff[0].id)
+    return {role: group[0] for role, group in users.items()}
+
+def full_scans(statement, parameters):
+    """Large tables `statement` reads without an index, per the database's own plan."""
+    if not statement.lstrip().upper().startswith(('SELECT', 'WITH', 'UPDATE', 'DELETE')):
+        return set(), []
+    with db.engine.connect() as connection:
+        if connection.dialect.name == 'sqlite':
+            plan = [row[-1] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+            pattern = re.compile(r'^SCAN (\w+)(?: LEFT-JOIN)?$')
+        else:
+            plan = [row[0] for row in connection.exec_driver_sql("EXPLAIN " + statement, parameters)]
+            pattern = re.compile(r'Seq Scan on (\w+)')
+    scanned = set()
+    for line in plan:
+        match = pattern.search(line.strip())
+        if match:
+            scanned.add(re.sub(r'_\d+$', '', match.group(1)))
+    return scanned & LARGE_TABLES, plan
+
+def check(name, run, budget, allowed_scans, verbose):
+    _statements.clear()
+    outcome = run()
+    statements = list(_statements)
+    problems = []
+    if outcome is not None and getattr(outcome, 'status_code', 200) >= 400:
+        problems.append(f"status {outcome.status_code}: {outcome.get_data(as_text=True)[:80]}")
+    if len(statements) > budget:
+        problems.append(f"{len(statements)} queries, budget {budget}")
+    for statement, parameters in statements:
+        scanned, plan = full_scans(statement, parameters)
+        if verbose and plan:
+            print(f"    {' '.join(statement.split())[:100]}\n      " + "\n      ".join(plan))
+        for table in sorted(scanned - set(allowed_scans)):
+            problems.append(f"full scan of {table}: {' '.join(statement.split())[:120]}")
+
+    mark = "✅" if not problems else "❌"
+    print(f"{mark} {name:70s} queries={len(statements)}/{budget}")
+    for problem in problems:
+        print(f"     {problem}")
+    return not problems
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=50000, help="synthetic grievances to seed")
+    parser.add_argument('--verbose', action='store_true', help="print every plan")
+    args = parser.parse_args()
+
+    app = create_app()
+    app.config['UPLOAD_FOLDER'] = _tmpdir
+    logging.disable(logging.INFO)
+    passed = True
+    with app.app_context():
+        db.create_all()
+        try:
+            print(f"Seeding {args.rows} grievances into {db.engine.url.render_as_string(hide_password=True)} ...")
+            users = {role.value: user.id for role, user in seed(args.rows).items()}
+            client = app.test_client()
+            event.listen(db.engine, 'before_cursor_execute', _record)
+
+            for role, path, budget, allowed_scans, overrides in ROUTES:
+                path = path.format(**_ids)
+                headers = {"Authorization": f"Bearer {create_access_token(identity=str(users[role]))}"}
+                saved = {key: app.config.get(key) for key in overrides}
+                app.config.update(overrides)
+                try:
+                    label = f"GET {path} ({role}{', rollup' if overrides.get('KPI_ROLLUP_ENABLED') else ''})"
+                    passed &= check(label, lambda: client.get(path, headers=headers), budget, allowed_scans, args.verbose)
+                finally:
+                    app.config.update(saved)
+
+            for name, func, budget, allowed_scans in SERVICES:
+                passed &= check(name, func, budget, allowed_scans, args.verbose)
+                db.session.remove()
+        finally:
+            if event.contains(db.engine, 'before_cursor_execute', _record):
+                event.remove(db.engine, 'before_cursor_execute', _record)
+            db.session.remove()
+            if os.environ.get('QUERY_PLAN_DATABASE_URL'):
+                db.drop_all()
+            db.engine.dispose()
+    shutil.rmtree(_tmpdir, ignore_errors=True)
+
+    print("\nAll query plans within budget" if passed else "\nQuery plan regressions found")
+    return 0 if passed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())